@@ -14,7 +14,17 @@ pyidevice IDB UI自动化示例
 """
 
 from pyidevice import IDBAutomator
-import time
+
+
+def screen_state(idb):
+    """界面状态指纹：重新获取元素树并计算哈希，用于判断操作后界面是否已变化"""
+    idb.invalidate_element_cache()
+    return hash(repr(idb.find_elements("Any")))
+
+
+def wait_screen_change(idb, before, timeout=1.0):
+    """等待界面状态与操作前不同，界面一旦变化立即返回，最多等待timeout秒"""
+    return idb.wait_until(lambda: screen_state(idb) != before, timeout=timeout)
 
 
 def main():
@@ -52,52 +62,59 @@ def main():
         # 启动应用（类似uiautomator2的d.app_start）
         app_bundle_id = "com.apple.Health"  # 示例应用
         print(f"\n🚀 启动应用: {app_bundle_id}")
+        # app_start会等待应用进入前台后才返回，无需再固定等待
         if idb.app_start(app_bundle_id):
             print("✅ 应用启动成功")
-            time.sleep(2)  # 等待应用加载
         else:
             print("❌ 应用启动失败")
             return 1
         
         # 1. 坐标点击（类似uiautomator2的d.click(x, y)）
         print("\n👆 坐标点击测试...")
+        before = screen_state(idb)
         if idb.tap_coordinate(200, 400):
             print("✅ 坐标点击成功")
-            time.sleep(1)
+            wait_screen_change(idb, before)
         
         # 2. 滑动操作（类似uiautomator2的d.swipe()）
         print("\n👆 滑动操作测试...")
         
         # 上滑
+        before = screen_state(idb)
         if idb.swipe_up(duration=1.0):
             print("✅ 上滑成功")
-            time.sleep(1)
+            wait_screen_change(idb, before)
         
         # 下滑
+        before = screen_state(idb)
         if idb.swipe_down(duration=1.0):
             print("✅ 下滑成功")
-            time.sleep(1)
+            wait_screen_change(idb, before)
         
         # 左滑
+        before = screen_state(idb)
         if idb.swipe_left(duration=1.0):
             print("✅ 左滑成功")
-            time.sleep(1)
+            wait_screen_change(idb, before)
         
         # 右滑
+        before = screen_state(idb)
         if idb.swipe_right(duration=1.0):
             print("✅ 右滑成功")
-            time.sleep(1)
+            wait_screen_change(idb, before)
         
         # 3. 按键操作（类似uiautomator2的d.press()）
         print("\n⌨️ 按键操作测试...")
         if idb.press_key("home"):
             print("✅ Home键按下成功")
-            time.sleep(2)
+            # 等待应用退到后台，而不是固定等待
+            idb.wait_until(
+                lambda: idb.app_current().get("bundle_id") != app_bundle_id, timeout=2.0
+            )
         
         # 重新启动应用
         if idb.app_start(app_bundle_id):
             print("✅ 应用重新启动成功")
-            time.sleep(2)
         
         # 4. 元素查找和操作
         print("\n🔍 元素查找和操作测试...")
@@ -108,19 +125,22 @@ def main():
             print("✅ 找到按钮元素")
             
             # 点击按钮（类似uiautomator2的d(className="UIButton").click()）
+            before = screen_state(idb)
             if idb.tap_element(button):
                 print("✅ 按钮点击成功")
-                time.sleep(1)
+                wait_screen_change(idb, before)
             
             # 长按按钮（类似uiautomator2的d(className="UIButton").long_click()）
+            before = screen_state(idb)
             if idb.long_press_element(button, duration=2.0):
                 print("✅ 按钮长按成功")
-                time.sleep(1)
+                wait_screen_change(idb, before)
             
             # 双击按钮
+            before = screen_state(idb)
             if idb.double_tap_element(button):
                 print("✅ 按钮双击成功")
-                time.sleep(1)
+                wait_screen_change(idb, before)
         else:
             print("⚠️ 未找到按钮元素")
         
@@ -151,31 +171,36 @@ def main():
         print("\n📝 文本输入测试...")
         text_field = idb.find_element("UITextField", index=0)
         if text_field:
+            before = screen_state(idb)
             if idb.input_text_to_element(text_field, "测试文本"):
                 print("✅ 文本输入成功")
-                time.sleep(1)
+                wait_screen_change(idb, before)
         else:
             print("⚠️ 未找到文本输入框")
         
         # 9. 拖拽操作（类似uiautomator2的d.drag()）
         print("\n👆 拖拽操作测试...")
+        before = screen_state(idb)
         if idb.drag(100, 200, 300, 400, duration=1.0):
             print("✅ 拖拽操作成功")
-            time.sleep(1)
+            wait_screen_change(idb, before)
         
         # 10. 多指操作（类似uiautomator2的d.pinch()）
         print("\n👆 多指操作测试...")
+        before = screen_state(idb)
         if idb.pinch(200, 300, scale=1.5, duration=1.0):
             print("✅ 放大操作成功")
-            time.sleep(1)
+            wait_screen_change(idb, before)
         
+        before = screen_state(idb)
         if idb.pinch(200, 300, scale=0.5, duration=1.0):
             print("✅ 缩小操作成功")
-            time.sleep(1)
+            wait_screen_change(idb, before)
         
         # 11. 截图（类似uiautomator2的d.screenshot()）
         print("\n📸 截图测试...")
-        screenshot_path = idb.screenshot("idb_ui_automation_screenshot.png")
+        # 直接写入设备返回的PNG数据，不解码再重新编码
+        screenshot_path = idb.screenshot_raw("idb_ui_automation_screenshot.png")
         if screenshot_path:
             print(f"✅ 截图保存成功: {screenshot_path}")
         
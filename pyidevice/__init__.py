@@ -48,7 +48,7 @@ from .exceptions import (
     PyIDeviceError,
 )
 from .device import Device
-from .idb import IDBAutomator, IDBWebViewAgent
+from .idb import IDBAutomator, IDBWebViewAgent, AsyncIDBAutomator, gather_many
 from .parallel import ParallelDeviceExecutor, ConcurrentDeviceManager, parallel_run
 from .config import Config, get_config
 from .utils import EnvironmentChecker, format_bytes, safe_filename, retry_on_failure
@@ -98,6 +98,8 @@ __all__ = [
     "Device",
     "IDBAutomator",
     "IDBWebViewAgent",
+    "AsyncIDBAutomator",
+    "gather_many",
     # 并发功能
     "ParallelDeviceExecutor",
     "ConcurrentDeviceManager",
@@ -1,14 +1,61 @@
 """自定义异常类模块"""
 
 import logging
+import sys
+import threading
+import time
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
 
+# 错误代码常量，显式驻留以保证按代码过滤时的指针比较快速路径
+_CODES = {
+    name: sys.intern(name)
+    for name in (
+        "DEVICE_CONNECTION_ERROR",
+        "DEVICE_COMMAND_ERROR",
+        "DEVICE_NOT_FOUND",
+        "DEVICE_TIMEOUT",
+        "DEVICE_PERMISSION_ERROR",
+        "APP_INSTALL_ERROR",
+        "APP_UNINSTALL_ERROR",
+        "APP_LAUNCH_ERROR",
+        "IDB_CONNECTION_ERROR",
+        "IDB_ELEMENT_ERROR",
+        "IDB_OPERATION_ERROR",
+        "CONFIGURATION_ERROR",
+        "ENVIRONMENT_ERROR",
+        "CACHE_ERROR",
+        "PERFORMANCE_ERROR",
+        "UNEXPECTED_ERROR",
+    )
+}
+
+# 线程本地状态：retry_on_failure 执行期间记录其会捕获并自行记录日志的异常类型，
+# 这些异常在构造时不再重复输出错误日志
+_log_state = threading.local()
+
+
+def _set_udid(error: "PyIDeviceError", udid: Optional[str]) -> None:
+    """设置异常的udid字段，非空时同时记入错误详情"""
+    error.udid = udid
+    if udid:
+        error.details["udid"] = udid
+
+
+def _set_bundle_id(error: "PyIDeviceError", bundle_id: Optional[str]) -> None:
+    """设置异常的bundle_id字段，非空时同时记入错误详情"""
+    error.bundle_id = bundle_id
+    if bundle_id:
+        error.details["bundle_id"] = bundle_id
+
 
 class PyIDeviceError(Exception):
     """pyidevice基础异常类"""
 
+    # 使用__slots__存放异常字段，减少高频错误路径上的单实例内存占用
+    __slots__ = ("message", "error_code", "details")
+
     def __init__(
         self,
         message: str,
@@ -28,42 +75,84 @@ class PyIDeviceError(Exception):
         self.error_code = error_code
         self.details = details or {}
 
-        # 记录错误日志
-        logger.error(f"PyIDeviceError: {message} (Code: {error_code})")
+        # 记录错误日志（由重试装饰器捕获的异常交给装饰器统一记录）
+        if isinstance(self, getattr(_log_state, "suppress_ctor_log", ())):
+            return
+        if not logger.isEnabledFor(logging.ERROR):
+            return
+        logger.error("PyIDeviceError: %s (Code: %s)", message, error_code)
         if details:
-            logger.error(f"Error details: {details}")
+            logger.error("Error details: %s", details)
+
+    def __reduce__(self):
+        """支持序列化（如跨进程传递），BaseException默认只保存__dict__，需补充slots字段"""
+        state = dict(getattr(self, "__dict__", {}))
+        for klass in type(self).__mro__:
+            for name in getattr(klass, "__slots__", ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return (type(self), self.args, state)
 
 
 class DeviceError(PyIDeviceError):
     """设备操作异常基类"""
 
-    def __init__(self, message: str, udid: Optional[str] = None, **kwargs):
+    __slots__ = ("udid",)
+
+    def __init__(
+        self,
+        message: str,
+        udid: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
         """
         初始化设备异常
 
         Args:
             message: 错误消息
             udid: 设备UDID
-            **kwargs: 其他参数
+            error_code: 错误代码
+            details: 错误详情
         """
-        super().__init__(message, **kwargs)
-        self.udid = udid
-        if udid:
-            self.details["udid"] = udid
+        PyIDeviceError.__init__(self, message, error_code, details)
+        _set_udid(self, udid)
+
+
+# 以下子类直接调用PyIDeviceError.__init__并显式传参，避免沿super()链逐层构建kwargs字典；
+# udid/bundle_id字段统一由_set_udid/_set_bundle_id设置
 
 
 class DeviceConnectionError(DeviceError):
     """设备连接异常"""
 
-    def __init__(self, message: str, udid: Optional[str] = None, **kwargs):
-        super().__init__(message, udid, error_code="DEVICE_CONNECTION_ERROR", **kwargs)
+    __slots__ = ()
+
+    def __init__(
+        self,
+        message: str,
+        udid: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        PyIDeviceError.__init__(
+            self, message, error_code or _CODES["DEVICE_CONNECTION_ERROR"], details
+        )
+        _set_udid(self, udid)
 
 
 class DeviceCommandError(DeviceError):
     """设备命令执行异常"""
 
+    __slots__ = ("command",)
+
     def __init__(
-        self, message: str, command: Optional[str] = None, udid: Optional[str] = None, **kwargs
+        self,
+        message: str,
+        command: Optional[str] = None,
+        udid: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
     ):
         """
         初始化设备命令异常
@@ -72,9 +161,11 @@ class DeviceCommandError(DeviceError):
             message: 错误消息
             command: 执行的命令
             udid: 设备UDID
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为DEVICE_COMMAND_ERROR
+            details: 错误详情
         """
-        super().__init__(message, udid, error_code="DEVICE_COMMAND_ERROR", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["DEVICE_COMMAND_ERROR"], details)
+        _set_udid(self, udid)
         self.command = command
         if command:
             self.details["command"] = command
@@ -83,15 +174,31 @@ class DeviceCommandError(DeviceError):
 class DeviceNotFoundError(DeviceError):
     """设备未找到异常"""
 
-    def __init__(self, message: str, udid: Optional[str] = None, **kwargs):
-        super().__init__(message, udid, error_code="DEVICE_NOT_FOUND", **kwargs)
+    __slots__ = ()
+
+    def __init__(
+        self,
+        message: str,
+        udid: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        PyIDeviceError.__init__(self, message, error_code or _CODES["DEVICE_NOT_FOUND"], details)
+        _set_udid(self, udid)
 
 
 class DeviceTimeoutError(DeviceError):
     """设备操作超时异常"""
 
+    __slots__ = ("timeout",)
+
     def __init__(
-        self, message: str, timeout: Optional[float] = None, udid: Optional[str] = None, **kwargs
+        self,
+        message: str,
+        timeout: Optional[float] = None,
+        udid: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
     ):
         """
         初始化设备超时异常
@@ -100,9 +207,11 @@ class DeviceTimeoutError(DeviceError):
             message: 错误消息
             timeout: 超时时间（秒）
             udid: 设备UDID
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为DEVICE_TIMEOUT
+            details: 错误详情
         """
-        super().__init__(message, udid, error_code="DEVICE_TIMEOUT", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["DEVICE_TIMEOUT"], details)
+        _set_udid(self, udid)
         self.timeout = timeout
         if timeout:
             self.details["timeout"] = timeout
@@ -111,37 +220,58 @@ class DeviceTimeoutError(DeviceError):
 class DevicePermissionError(DeviceError):
     """设备权限异常"""
 
-    def __init__(self, message: str, udid: Optional[str] = None, **kwargs):
-        super().__init__(message, udid, error_code="DEVICE_PERMISSION_ERROR", **kwargs)
+    __slots__ = ()
+
+    def __init__(
+        self,
+        message: str,
+        udid: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        PyIDeviceError.__init__(
+            self, message, error_code or _CODES["DEVICE_PERMISSION_ERROR"], details
+        )
+        _set_udid(self, udid)
 
 
 class AppError(PyIDeviceError):
     """应用操作异常基类"""
 
-    def __init__(self, message: str, bundle_id: Optional[str] = None, **kwargs):
+    __slots__ = ("bundle_id",)
+
+    def __init__(
+        self,
+        message: str,
+        bundle_id: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
         """
         初始化应用异常
 
         Args:
             message: 错误消息
             bundle_id: 应用包ID
-            **kwargs: 其他参数
+            error_code: 错误代码
+            details: 错误详情
         """
-        super().__init__(message, **kwargs)
-        self.bundle_id = bundle_id
-        if bundle_id:
-            self.details["bundle_id"] = bundle_id
+        PyIDeviceError.__init__(self, message, error_code, details)
+        _set_bundle_id(self, bundle_id)
 
 
 class AppInstallError(AppError):
     """应用安装异常"""
 
+    __slots__ = ("ipa_path",)
+
     def __init__(
         self,
         message: str,
         bundle_id: Optional[str] = None,
         ipa_path: Optional[str] = None,
-        **kwargs,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
     ):
         """
         初始化应用安装异常
@@ -150,9 +280,11 @@ class AppInstallError(AppError):
             message: 错误消息
             bundle_id: 应用包ID
             ipa_path: IPA文件路径
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为APP_INSTALL_ERROR
+            details: 错误详情
         """
-        super().__init__(message, bundle_id, error_code="APP_INSTALL_ERROR", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["APP_INSTALL_ERROR"], details)
+        _set_bundle_id(self, bundle_id)
         self.ipa_path = ipa_path
         if ipa_path:
             self.details["ipa_path"] = ipa_path
@@ -161,41 +293,73 @@ class AppInstallError(AppError):
 class AppUninstallError(AppError):
     """应用卸载异常"""
 
-    def __init__(self, message: str, bundle_id: Optional[str] = None, **kwargs):
-        super().__init__(message, bundle_id, error_code="APP_UNINSTALL_ERROR", **kwargs)
+    __slots__ = ()
+
+    def __init__(
+        self,
+        message: str,
+        bundle_id: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        PyIDeviceError.__init__(self, message, error_code or _CODES["APP_UNINSTALL_ERROR"], details)
+        _set_bundle_id(self, bundle_id)
 
 
 class AppLaunchError(AppError):
     """应用启动异常"""
 
-    def __init__(self, message: str, bundle_id: Optional[str] = None, **kwargs):
-        super().__init__(message, bundle_id, error_code="APP_LAUNCH_ERROR", **kwargs)
+    __slots__ = ()
+
+    def __init__(
+        self,
+        message: str,
+        bundle_id: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        PyIDeviceError.__init__(self, message, error_code or _CODES["APP_LAUNCH_ERROR"], details)
+        _set_bundle_id(self, bundle_id)
 
 
 class IDBError(PyIDeviceError):
     """IDB异常基类"""
 
-    def __init__(self, message: str, udid: Optional[str] = None, **kwargs):
+    __slots__ = ("udid",)
+
+    def __init__(
+        self,
+        message: str,
+        udid: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
         """
         初始化IDB异常
 
         Args:
             message: 错误消息
             udid: 设备UDID
-            **kwargs: 其他参数
+            error_code: 错误代码
+            details: 错误详情
         """
-        super().__init__(message, **kwargs)
-        self.udid = udid
-        if udid:
-            self.details["udid"] = udid
+        PyIDeviceError.__init__(self, message, error_code, details)
+        _set_udid(self, udid)
 
 
 class IDBConnectionError(IDBError):
     """IDB连接异常"""
 
+    __slots__ = ("host", "port")
+
     def __init__(
-        self, message: str, udid: Optional[str] = None, host: Optional[str] = None, 
-        port: Optional[int] = None, **kwargs
+        self,
+        message: str,
+        udid: Optional[str] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
     ):
         """
         初始化IDB连接异常
@@ -205,9 +369,11 @@ class IDBConnectionError(IDBError):
             udid: 设备UDID
             host: IDB服务主机
             port: IDB服务端口
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为IDB_CONNECTION_ERROR
+            details: 错误详情
         """
-        super().__init__(message, udid, error_code="IDB_CONNECTION_ERROR", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["IDB_CONNECTION_ERROR"], details)
+        _set_udid(self, udid)
         self.host = host
         self.port = port
         if host:
@@ -219,12 +385,15 @@ class IDBConnectionError(IDBError):
 class IDBElementError(IDBError):
     """IDB元素操作异常"""
 
+    __slots__ = ("element_info",)
+
     def __init__(
         self,
         message: str,
         element_info: Optional[Dict[str, Any]] = None,
         udid: Optional[str] = None,
-        **kwargs,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
     ):
         """
         初始化IDB元素异常
@@ -233,9 +402,11 @@ class IDBElementError(IDBError):
             message: 错误消息
             element_info: 元素信息
             udid: 设备UDID
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为IDB_ELEMENT_ERROR
+            details: 错误详情
         """
-        super().__init__(message, udid, error_code="IDB_ELEMENT_ERROR", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["IDB_ELEMENT_ERROR"], details)
+        _set_udid(self, udid)
         self.element_info = element_info
         if element_info:
             self.details["element_info"] = element_info
@@ -244,8 +415,15 @@ class IDBElementError(IDBError):
 class IDBOperationError(IDBError):
     """IDB操作异常"""
 
+    __slots__ = ("operation",)
+
     def __init__(
-        self, message: str, operation: Optional[str] = None, udid: Optional[str] = None, **kwargs
+        self,
+        message: str,
+        operation: Optional[str] = None,
+        udid: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
     ):
         """
         初始化IDB操作异常
@@ -254,9 +432,11 @@ class IDBOperationError(IDBError):
             message: 错误消息
             operation: 操作类型
             udid: 设备UDID
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为IDB_OPERATION_ERROR
+            details: 错误详情
         """
-        super().__init__(message, udid, error_code="IDB_OPERATION_ERROR", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["IDB_OPERATION_ERROR"], details)
+        _set_udid(self, udid)
         self.operation = operation
         if operation:
             self.details["operation"] = operation
@@ -265,16 +445,25 @@ class IDBOperationError(IDBError):
 class ConfigurationError(PyIDeviceError):
     """配置异常"""
 
-    def __init__(self, message: str, config_key: Optional[str] = None, **kwargs):
+    __slots__ = ("config_key",)
+
+    def __init__(
+        self,
+        message: str,
+        config_key: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
         """
         初始化配置异常
 
         Args:
             message: 错误消息
             config_key: 配置键
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为CONFIGURATION_ERROR
+            details: 错误详情
         """
-        super().__init__(message, error_code="CONFIGURATION_ERROR", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["CONFIGURATION_ERROR"], details)
         self.config_key = config_key
         if config_key:
             self.details["config_key"] = config_key
@@ -283,16 +472,25 @@ class ConfigurationError(PyIDeviceError):
 class EnvironmentError(PyIDeviceError):
     """环境异常"""
 
-    def __init__(self, message: str, missing_tools: Optional[list] = None, **kwargs):
+    __slots__ = ("missing_tools",)
+
+    def __init__(
+        self,
+        message: str,
+        missing_tools: Optional[list] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
         """
         初始化环境异常
 
         Args:
             message: 错误消息
             missing_tools: 缺失的工具列表
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为ENVIRONMENT_ERROR
+            details: 错误详情
         """
-        super().__init__(message, error_code="ENVIRONMENT_ERROR", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["ENVIRONMENT_ERROR"], details)
         self.missing_tools = missing_tools or []
         if missing_tools:
             self.details["missing_tools"] = missing_tools
@@ -301,16 +499,25 @@ class EnvironmentError(PyIDeviceError):
 class CacheError(PyIDeviceError):
     """缓存异常"""
 
-    def __init__(self, message: str, cache_key: Optional[str] = None, **kwargs):
+    __slots__ = ("cache_key",)
+
+    def __init__(
+        self,
+        message: str,
+        cache_key: Optional[str] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ):
         """
         初始化缓存异常
 
         Args:
             message: 错误消息
             cache_key: 缓存键
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为CACHE_ERROR
+            details: 错误详情
         """
-        super().__init__(message, error_code="CACHE_ERROR", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["CACHE_ERROR"], details)
         self.cache_key = cache_key
         if cache_key:
             self.details["cache_key"] = cache_key
@@ -319,8 +526,15 @@ class CacheError(PyIDeviceError):
 class PerformanceError(PyIDeviceError):
     """性能异常"""
 
+    __slots__ = ("metric", "value")
+
     def __init__(
-        self, message: str, metric: Optional[str] = None, value: Optional[float] = None, **kwargs
+        self,
+        message: str,
+        metric: Optional[str] = None,
+        value: Optional[float] = None,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
     ):
         """
         初始化性能异常
@@ -329,9 +543,10 @@ class PerformanceError(PyIDeviceError):
             message: 错误消息
             metric: 性能指标
             value: 指标值
-            **kwargs: 其他参数
+            error_code: 错误代码，默认为PERFORMANCE_ERROR
+            details: 错误详情
         """
-        super().__init__(message, error_code="PERFORMANCE_ERROR", **kwargs)
+        PyIDeviceError.__init__(self, message, error_code or _CODES["PERFORMANCE_ERROR"], details)
         self.metric = metric
         self.value = value
         if metric:
@@ -351,10 +566,10 @@ def handle_exception(func):
             raise
         except Exception as e:
             # 包装未知异常
-            logger.error(f"Unexpected error in {func.__name__}: {e}")
+            logger.error("Unexpected error in %s: %s", func.__name__, e)
             raise PyIDeviceError(
                 f"Unexpected error in {func.__name__}: {str(e)}",
-                error_code="UNEXPECTED_ERROR",
+                error_code=_CODES["UNEXPECTED_ERROR"],
                 details={"original_error": str(e), "function": func.__name__},
             ) from e
 
@@ -373,26 +588,32 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0, exceptions: tuple
 
     def decorator(func):
         def wrapper(*args, **kwargs):
-            last_exception = None
-
-            for attempt in range(max_retries + 1):
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-                    if attempt < max_retries:
+            suppressed = getattr(_log_state, "suppress_ctor_log", ())
+            _log_state.suppress_ctor_log = exceptions
+            try:
+                for attempt in range(max_retries):
+                    try:
+                        return func(*args, **kwargs)
+                    except exceptions as e:
                         logger.warning(
-                            f"Attempt {attempt + 1} failed for {func.__name__}: {e}. Retrying in {delay}s..."
+                            "Attempt %d failed for %s: %s. Retrying in %.2fs...",
+                            attempt + 1,
+                            func.__name__,
+                            e,
+                            delay,
                         )
-                        import time
-
                         time.sleep(delay)
-                    else:
-                        logger.error(f"All {max_retries + 1} attempts failed for {func.__name__}")
-                        raise e
 
-            # 这行代码理论上不会执行到
-            raise last_exception
+                # 最后一次尝试，失败时直接向上抛出
+                try:
+                    return func(*args, **kwargs)
+                except exceptions as e:
+                    logger.error(
+                        "All %d attempts failed for %s: %s", max_retries + 1, func.__name__, e
+                    )
+                    raise
+            finally:
+                _log_state.suppress_ctor_log = suppressed
 
         # 保留原函数的文档字符串和属性
         wrapper.__doc__ = func.__doc__
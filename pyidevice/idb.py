@@ -29,12 +29,22 @@ pyidevice IDB模块
 """
 
 import time
+import asyncio
 import logging
-from typing import Optional, Dict, List, Any, Union, Tuple
+import functools
+import importlib.util
+import inspect
+import math
+from typing import Optional, Dict, List, Any, Union, Tuple, Callable
 import os
 import re
+import selectors
+import socket
 import subprocess
 import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from .stability import (
     get_retry_manager,
     get_timeout_manager,
@@ -50,20 +60,407 @@ from .stability import (
 # 配置日志记录器
 logger = logging.getLogger(__name__)
 
-# 尝试导入IDB，如果失败则提供友好的错误信息
-try:
-    import idb
-    IDB_AVAILABLE = True
-except ImportError:
-    IDB_AVAILABLE = False
+# 仅检查IDB是否已安装，实际导入推迟到首次创建IDBAutomator时，
+# 只使用非IDB功能时不必加载idb客户端（grpc、protobuf等）
+IDB_AVAILABLE = importlib.util.find_spec("idb") is not None
+if not IDB_AVAILABLE:
     logger.warning("IDB模块未安装，请运行: pip install idb")
 
 
+@functools.lru_cache(maxsize=1)
+def _load_idb() -> Any:
+    """首次使用时导入idb模块"""
+    import idb
+    return idb
+
+
 class IDBError(Exception):
     """IDB相关错误"""
     pass
 
 
+def _quote_predicate_value(value: Any) -> Optional[str]:
+    """将查找条件的值转换为NSPredicate字面量，无法表示的值返回None"""
+    if isinstance(value, str):
+        return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    if value is None:
+        return "nil"
+    if isinstance(value, bool):
+        return "YES" if value else "NO"
+    if isinstance(value, int) or (isinstance(value, float) and math.isfinite(value)):
+        return repr(value)
+    return None
+
+
+def _build_predicate(element_type: str, label: Optional[str] = None,
+                     name: Optional[str] = None, **kwargs) -> Optional[str]:
+    """
+    根据查找条件构建NSPredicate，交由IDB Companion在设备端完成匹配
+
+    匹配语义与Python端过滤保持一致：label/name仅在非空时参与匹配，其他条件总是参与匹配。
+    条件值只支持字符串、数字、布尔值和None，其他类型无法下推时返回None，由调用方在本地过滤。
+
+    Args:
+        element_type: 元素类型
+        label: 元素标签
+        name: 元素名称
+        **kwargs: 其他查找条件
+
+    Returns:
+        Optional[str]: NSPredicate字符串，如 "elementType == 'Button' AND label == '登录'"；
+        存在无法下推的条件值时返回None
+    """
+    items = tuple(sorted(kwargs.items()))
+    try:
+        return _cached_predicate(element_type, label, name, items)
+    except TypeError:
+        # 条件值不可哈希时无法缓存，直接构建
+        return _cached_predicate.__wrapped__(element_type, label, name, items)
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_predicate(element_type: str, label: Optional[str], name: Optional[str],
+                      items: Tuple[Tuple[str, Any], ...]) -> Optional[str]:
+    """_build_predicate的缓存实现，轮询等待同一元素时不必重复拼接"""
+    conditions = [("elementType", element_type)]
+    if label:
+        conditions.append(("label", label))
+    if name:
+        conditions.append(("name", name))
+    conditions.extend(items)
+
+    clauses = []
+    for key, value in conditions:
+        literal = _quote_predicate_value(value)
+        if literal is None:
+            return None
+        clauses.append(f"{key} == {literal}")
+    return " AND ".join(clauses)
+
+
+# 批量操作在客户端不支持原生批量接口时的逐条回放方式
+_BATCH_REPLAY = {
+    "tap": lambda device, op: device.tap((op["x"], op["y"])),
+    "swipe": lambda device, op: device.swipe(
+        (op["start_x"], op["start_y"]), (op["end_x"], op["end_y"]), duration=op["duration"]
+    ),
+    "input_text": lambda device, op: device.input_text(op["text"]),
+    "press_key": lambda device, op: device.press_key(op["key"]),
+}
+
+
+def _find_elements_params(device: Any) -> frozenset:
+    """检测idb客户端的find_elements支持哪些设备端过滤参数（predicate/limit）"""
+    try:
+        params = inspect.signature(device.find_elements).parameters
+    except (AttributeError, TypeError, ValueError):
+        return frozenset()
+    return frozenset(name for name in ("predicate", "limit") if name in params)
+
+
+@functools.lru_cache(maxsize=1)
+def _device_accepts_transport() -> bool:
+    """检测idb.Device是否支持注入外部transport（长连接会话）"""
+    try:
+        return "transport" in inspect.signature(_load_idb().Device).parameters
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+
+# 断开后暂存的设备对象：(udid, host, port) -> (设备对象, 长连接会话)，按LRU淘汰，
+# 重连时直接复用，免去重新握手
+_device_pool: "OrderedDict[Tuple[str, str, int], Tuple[Any, Any]]" = OrderedDict()
+_device_pool_lock = threading.Lock()
+_DEVICE_POOL_SIZE = 8
+
+
+def _close_session(session: Any) -> None:
+    if session is not None:
+        try:
+            session.close()
+        except Exception:
+            pass
+
+
+def _park_device(key: Tuple[str, str, int], device: Any, session: Any) -> None:
+    """将断开的设备对象放回池中，超出容量时关闭最久未用的"""
+    with _device_pool_lock:
+        old = _device_pool.pop(key, None)
+        _device_pool[key] = (device, session)
+        evicted = _device_pool.popitem(last=False) if len(_device_pool) > _DEVICE_POOL_SIZE else None
+    if old is not None and old[1] is not session:
+        _close_session(old[1])
+    if evicted is not None:
+        _close_session(evicted[1][1])
+
+
+def _take_pooled_device(key: Tuple[str, str, int]) -> Optional[Tuple[Any, Any]]:
+    """取出池中的设备对象，没有时返回None"""
+    with _device_pool_lock:
+        return _device_pool.pop(key, None)
+
+
+def _idb_rpc(action: str):
+    """
+    IDB调用包装装饰器
+
+    统一处理连接检查与异常转换：未连接时抛出IDBError，调用失败时记录日志
+    并包装为IDBError抛出。
+
+    Args:
+        action: 操作描述，用于错误信息（如"获取设备信息"）
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not self._is_connected or self.device is None:
+                raise IDBError("设备未连接")
+            try:
+                return func(self, *args, **kwargs)
+            except Exception as e:
+                logger.error("%s失败: %s", action, e)
+                raise IDBError(f"{action}失败: {e}") from e
+        return wrapper
+    return decorator
+
+
+# 文件传输分块大小：客户端支持时使用大块传输，减少分块往返次数
+_FILE_CHUNK_SIZE = 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts_chunk_size(device_type: type, method: str) -> bool:
+    """检测idb客户端的文件传输方法是否支持chunk_size参数"""
+    try:
+        return "chunk_size" in inspect.signature(getattr(device_type, method)).parameters
+    except (AttributeError, TypeError, ValueError):
+        return False
+
+
+def _annotate_centers(elements: List[Dict[str, Any]]) -> None:
+    """为元素预先计算点击中心点，存入'_center'，tap_element直接使用"""
+    for element in elements:
+        bounds = element.get('bounds')
+        if bounds:
+            element['_center'] = (bounds.get('x', 0) + bounds.get('width', 0) // 2,
+                                  bounds.get('y', 0) + bounds.get('height', 0) // 2)
+
+
+def _save_screenshot(image: Any, save_path: str, fmt: str, quality: int) -> None:
+    """按指定格式保存截图，JPEG不支持透明通道时先转换为RGB"""
+    if fmt == "png":
+        image.save(save_path)
+        return
+    if getattr(image, "mode", "RGB") != "RGB" and hasattr(image, "convert"):
+        image = image.convert("RGB")
+    image.save(save_path, "JPEG", quality=quality)
+
+
+# 原始截图数据写文件时每次write的块大小
+_SCREENSHOT_WRITE_CHUNK = 64 * 1024
+
+
+def _write_screenshot_bytes(data: Any, save_path: str) -> None:
+    """将客户端返回的已编码截图数据（bytes或分块迭代器）原样写入文件，不经过解码和重新编码"""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        whole = memoryview(data)
+        chunks = (whole[i:i + _SCREENSHOT_WRITE_CHUNK]
+                  for i in range(0, len(whole), _SCREENSHOT_WRITE_CHUNK))
+    else:
+        chunks = data
+    fd = os.open(save_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        for chunk in chunks:
+            view = memoryview(chunk)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def _log_screenshot_saved(save_path: str, future: Any) -> None:
+    """后台截图保存完成回调"""
+    error = future.exception()
+    if error is not None:
+        logger.error(f"截图保存失败 {save_path}: {error}")
+    else:
+        logger.info(f"截图保存到: {save_path}")
+
+
+class _ElementTable:
+    """
+    元素快照的按列视图
+
+    按属性名惰性构建列（同一属性只对每个元素取值一次），同一快照上的重复查询
+    直接比较列中的值，不再对每个元素的字典反复做键查找。rows保留原始元素字典。
+    """
+
+    __slots__ = ("rows", "_columns")
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self._columns: Dict[str, List[Any]] = {}
+
+    def column(self, key: str) -> List[Any]:
+        col = self._columns.get(key)
+        if col is None:
+            col = self._columns[key] = [row.get(key) for row in self.rows]
+        return col
+
+    def match(self, conditions: Dict[str, Any]) -> List[int]:
+        """返回满足全部条件的元素下标，按条件逐列缩小候选集"""
+        indices = None
+        for key, value in conditions.items():
+            col = self.column(key)
+            if indices is None:
+                indices = [i for i, v in enumerate(col) if v == value]
+            else:
+                indices = [i for i in indices if col[i] == value]
+            if not indices:
+                return []
+        return list(range(len(self.rows))) if indices is None else indices
+
+    def filter(self, conditions: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = self.rows
+        return [rows[i] for i in self.match(conditions)]
+
+
+class _MonitorStream:
+    """
+    监控数据流
+
+    持续消费idb的订阅流（日志/网络/性能），写入有界队列，
+    读取方每次只取新增数据，不再每次轮询都复制整个缓冲区。
+
+    订阅流提供fileno()时（socket类数据源）交给共享的_MonitorHub统一select，
+    否则视为阻塞迭代器，由独立线程消费。
+    """
+
+    def __init__(self, name: str, source: Any, maxlen: int):
+        self.name = name
+        self.source = source
+        self.buffer = deque(maxlen=maxlen)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._hub: Optional["_MonitorHub"] = None
+
+    def start(self, hub: "_MonitorHub") -> None:
+        if hasattr(self.source, "fileno"):
+            self._hub = hub
+            hub.register(self)
+            return
+        self._thread = threading.Thread(target=self._run, name=f"idb-{self.name}-stream", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            for item in self.source:
+                if self._stop.is_set():
+                    break
+                self.buffer.append(item)
+        except Exception as e:
+            if not self._stop.is_set():
+                logger.warning(f"{self.name}数据流中断: {e}")
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop.set()
+        if self._hub is not None:
+            self._hub.unregister(self)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        close = getattr(self.source, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+
+    def drain(self) -> List[Any]:
+        """取出并清空当前已缓冲的数据（popleft与后台append并发安全，不会丢数据）"""
+        items = []
+        popleft = self.buffer.popleft
+        try:
+            while True:
+                items.append(popleft())
+        except IndexError:
+            return items
+
+    def latest(self) -> Optional[Any]:
+        """最近一条数据，尚无数据时返回None"""
+        try:
+            return self.buffer[-1]
+        except IndexError:
+            return None
+
+
+class _MonitorHub:
+    """
+    监控流的共享读取线程
+
+    所有可select的订阅流注册到同一个selector，由一个线程统一等待可读事件并分发到
+    各自的缓冲区，多个监控同时开启时不再每个流占用一个线程。数据源可读时调用其
+    read()，返回本次读到的条目列表，返回None表示流已结束。
+    没有注册的流时线程自动退出，下次注册时重新启动。
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, stream: _MonitorStream) -> None:
+        with self._lock:
+            self._selector.register(stream.source, selectors.EVENT_READ, stream)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="idb-monitor-hub", daemon=True)
+                self._thread.start()
+
+    def unregister(self, stream: _MonitorStream) -> None:
+        with self._lock:
+            try:
+                self._selector.unregister(stream.source)
+            except (KeyError, ValueError):
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            self._selector.close()
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                if not self._selector.get_map():
+                    self._thread = None
+                    return
+            try:
+                events = self._selector.select(0.5)
+            except (OSError, ValueError):
+                # selector已关闭
+                with self._lock:
+                    self._thread = None
+                return
+            for key, _ in events:
+                stream = key.data
+                try:
+                    items = key.fileobj.read()
+                except Exception as e:
+                    logger.warning(f"{stream.name}数据流中断: {e}")
+                    items = None
+                if items is None:
+                    self.unregister(stream)
+                else:
+                    stream.buffer.extend(items)
+
+
+# 监控类型 -> (idb订阅流方法名, 缓冲区上限)
+_MONITOR_STREAMS = {
+    "logs": ("log_stream", 10000),
+    "network": ("network_stream", 1000),
+    "performance": ("performance_stream", 1000),
+}
+
+
 class IDBAutomator:
     """
     iOS设备UI自动化控制器
@@ -136,6 +533,7 @@ class IDBAutomator:
         # 检查IDB模块是否可用
         if not IDB_AVAILABLE:
             raise IDBError("IDB模块未安装，请运行: pip install idb")
+        _load_idb()
         
         # 验证输入参数
         validator = get_input_validator()
@@ -153,12 +551,51 @@ class IDBAutomator:
         self.device = None  # IDB设备对象，连接后初始化
         self._is_connected = False  # 连接状态标志
         self._companion_process = None  # IDB Companion进程对象
+        self._session = None  # 与Companion通信的长连接会话，connect()时创建、disconnect()时关闭
+        self._streams: Dict[str, _MonitorStream] = {}  # 正在运行的监控数据流
+        self._monitor_hub: Optional[_MonitorHub] = None  # 监控流共享读取线程，首次使用时创建
+        self._io_pool: Optional[ThreadPoolExecutor] = None  # 截图后台保存线程池，首次使用时创建
+        
+        # 元素快照缓存：(element_type, predicate, limit) -> (获取时间, 元素列表)，
+        # 任何改变界面的操作都会清空
+        self._elements_cache: Dict[Tuple[str, Optional[str], Optional[int]],
+                                   Tuple[float, _ElementTable]] = {}
+        self._elements_cache_ttl = 0.25  # 元素快照有效期（秒）
+        self._find_params = frozenset()  # idb客户端find_elements支持的设备端过滤参数
+        self._orientation_epoch = 0  # 屏幕方向变化计数，供屏幕信息缓存判断是否失效
+        
+        # 批量操作队列，仅在batch()上下文中不为None
+        self._batch_queue: Optional[List[Dict[str, Any]]] = None
+        self._batch_max_size = 64  # 队列达到该长度时自动提交
         
         # 初始化稳定性组件
         self._retry_manager = get_retry_manager()
         self._timeout_manager = get_timeout_manager()
         self._circuit_breaker = get_circuit_breaker()
 
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _companion_version() -> str:
+        """
+        获取IDB Companion版本（进程内缓存，仅成功结果会被缓存）
+
+        Returns:
+            str: IDB Companion版本号
+
+        Raises:
+            FileNotFoundError: 未安装IDB Companion
+            subprocess.CalledProcessError: IDB Companion未正确安装
+            subprocess.TimeoutExpired: IDB Companion响应超时
+        """
+        result = subprocess.run(
+            ["idb_companion", "--version"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=True,
+        )
+        return result.stdout.strip()
+
     def _ensure_idb_companion_installed(self) -> bool:
         """
         检查IDB Companion是否已安装
@@ -167,18 +604,12 @@ class IDBAutomator:
             bool: 如果已安装返回True，否则返回False
         """
         try:
-            result = subprocess.run(
-                ["idb_companion", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            if result.returncode == 0:
-                logger.info(f"IDB Companion已安装，版本: {result.stdout.strip()}")
-                return True
-            else:
-                logger.error("IDB Companion未正确安装")
-                return False
+            version = self._companion_version()
+            logger.info(f"IDB Companion已安装，版本: {version}")
+            return True
+        except subprocess.CalledProcessError:
+            logger.error("IDB Companion未正确安装")
+            return False
         except FileNotFoundError:
             logger.error("IDB Companion未安装，请运行: brew install idb-companion")
             return False
@@ -189,19 +620,35 @@ class IDBAutomator:
             logger.error(f"检查IDB Companion时出错: {e}")
             return False
 
-    def _start_idb_companion(self) -> bool:
+    def _is_companion_reachable(self, timeout: float = 0.1) -> bool:
+        """
+        检查IDB Companion服务端口是否可连接
+
+        Args:
+            timeout: 连接超时时间（秒）
+
+        Returns:
+            bool: 端口可连接返回True，否则返回False
+        """
+        try:
+            socket.create_connection((self.host, self.port), timeout=timeout).close()
+            return True
+        except OSError:
+            return False
+
+    def _start_idb_companion(self, startup_timeout: float = 10.0) -> bool:
         """
         启动IDB Companion服务
 
+        Args:
+            startup_timeout: 等待服务端口就绪的最长时间（秒）
+
         Returns:
             bool: 如果启动成功返回True，否则返回False
         """
         try:
-            # 检查是否已有服务在运行
-            result = subprocess.run(
-                ["ps", "aux"], capture_output=True, text=True
-            )
-            if "idb_companion" in result.stdout:
+            # 检查是否已有服务在运行（直接探测服务端口，无需扫描进程列表）
+            if self._is_companion_reachable():
                 logger.info("IDB Companion服务已在运行")
                 return True
 
@@ -213,15 +660,21 @@ class IDBAutomator:
                 text=True
             )
             
-            # 等待服务启动
-            time.sleep(3)
-            
-            if self._companion_process.poll() is None:
-                logger.info("IDB Companion服务启动成功")
-                return True
-            else:
-                logger.error("IDB Companion服务启动失败")
-                return False
+            # 轮询服务端口直到就绪，退避间隔从25ms逐步增加到200ms
+            deadline = time.monotonic() + startup_timeout
+            delay = 0.025
+            while time.monotonic() < deadline:
+                if self._companion_process.poll() is not None:
+                    logger.error("IDB Companion服务启动失败")
+                    return False
+                if self._is_companion_reachable(timeout=delay):
+                    logger.info("IDB Companion服务启动成功")
+                    return True
+                time.sleep(delay)
+                delay = min(delay * 2, 0.2)
+
+            logger.error(f"IDB Companion服务在 {startup_timeout} 秒内未就绪")
+            return False
                 
         except Exception as e:
             logger.error(f"启动IDB Companion服务时出错: {e}")
@@ -245,13 +698,32 @@ class IDBAutomator:
         if not self._start_idb_companion():
             return False
 
+        pooled = False
+        if self.device is None:
+            entry = _take_pooled_device((self.udid, self.host, self.port))
+            if entry is not None:
+                self.device, self._session = entry
+                self._find_params = _find_elements_params(self.device)
+                pooled = True
+
         for i in range(retry_count):
             try:
-                # 连接到IDB设备
-                self.device = idb.Device(udid=self.udid, host=self.host, port=self.port)
+                # 连接到IDB设备，重试时复用已建立的设备对象和底层连接
+                if self.device is None:
+                    self.device = self._create_device()
                 
                 # 测试连接
-                info = self.device.info()
+                try:
+                    info = self.device.info()
+                except Exception:
+                    if not pooled:
+                        raise
+                    # 池中的设备对象已失效，丢弃后立即重新创建
+                    pooled = False
+                    _close_session(self._session)
+                    self._session = None
+                    self.device = self._create_device()
+                    info = self.device.info()
                 logger.info(f"成功连接到设备 {self.udid}")
                 logger.info(f"设备信息: {info.get('name', 'Unknown')} - iOS {info.get('os_version', 'Unknown')}")
                 
@@ -264,22 +736,139 @@ class IDBAutomator:
                     time.sleep(retry_interval)
 
         logger.error(f"连接设备 {self.udid} 失败，已重试 {retry_count} 次")
+        self.device = None
         return False
 
-    def disconnect(self) -> None:
-        """断开连接并清理资源"""
-        if self._companion_process and self._companion_process.poll() is None:
+    def _create_device(self) -> Any:
+        """
+        创建idb设备对象
+
+        客户端支持transport参数时注入一个长连接会话，所有RPC复用同一连接，
+        避免每次调用重新建立TCP连接。
+        """
+        kwargs = {"udid": self.udid, "host": self.host, "port": self.port}
+        if _device_accepts_transport():
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+            kwargs["transport"] = self._session
+
+        device = _load_idb().Device(**kwargs)
+        self._find_params = _find_elements_params(device)
+        return device
+
+    def disconnect(self, force: bool = False) -> None:
+        """
+        断开连接并清理资源
+
+        Companion服务不是由本实例启动时，设备对象会暂存到连接池，
+        同一设备再次connect()时直接复用。
+
+        Args:
+            force: 为True时直接关闭设备对象，不放回连接池
+        """
+        owns_companion = self._companion_process is not None and self._companion_process.poll() is None
+        if owns_companion:
             self._companion_process.terminate()
-            self._companion_process.wait(timeout=3.0)
+            try:
+                self._companion_process.wait(timeout=3.0)
+            except subprocess.TimeoutExpired:
+                # 未响应SIGTERM时强制结束，避免残留进程占用端口
+                logger.warning("IDB Companion服务未响应终止信号，强制结束")
+                self._companion_process.kill()
+                self._companion_process.wait()
             logger.info("IDB Companion服务已终止")
+        self._companion_process = None
+
+        for kind in list(self._streams):
+            self._stop_stream(kind)
+        if self._monitor_hub is not None:
+            self._monitor_hub.close()
+            self._monitor_hub = None
+
+        # 等待后台保存中的截图写完
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
+
+        # Companion仍在运行时暂存设备对象，长连接会话随之转交给连接池
+        if self.device is not None and self._is_connected and not force and not owns_companion:
+            _park_device((self.udid, self.host, self.port), self.device, self._session)
+            self._session = None
+
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
         self.device = None
         self._is_connected = False
+        self._elements_cache.clear()
 
     def is_connected(self) -> bool:
         """检查是否已连接"""
         return self._is_connected and self.device is not None
 
+    def invalidate_element_cache(self) -> None:
+        """清空元素快照缓存，下一次查找将重新从设备获取"""
+        self._elements_cache.clear()
+
+    @contextmanager
+    def batch(self):
+        """
+        批量操作上下文：期间的tap/swipe/input_text/press_key先进入队列，退出时一次性提交
+
+        连续的input_text会合并为一次输入。客户端提供原生批量接口（device.batch）时整批
+        一次提交，否则按顺序逐条执行。队列中的操作在提交前总是返回True。
+
+        Example:
+            >>> with idb.batch():
+            ...     idb.tap(100, 200)
+            ...     idb.input_text("hello")
+            ...     idb.press_key("return")
+        """
+        if self._batch_queue is not None:
+            # 嵌套调用时并入外层批次
+            yield self
+            return
+
+        self._batch_queue = []
+        try:
+            yield self
+            self._flush_batch()
+        finally:
+            self._batch_queue = None
+
+    def _enqueue_batch_op(self, op: Dict[str, Any]) -> None:
+        """将操作加入批量队列，必要时合并或自动提交"""
+        queue = self._batch_queue
+        if op["op"] == "input_text" and queue and queue[-1]["op"] == "input_text":
+            queue[-1]["text"] += op["text"]
+        else:
+            queue.append(op)
+        if len(queue) >= self._batch_max_size:
+            self._flush_batch()
+
+    def _flush_batch(self) -> None:
+        """提交批量队列中的所有操作"""
+        ops = self._batch_queue
+        if not ops:
+            return
+        self._batch_queue = []
+        self._elements_cache.clear()
+
+        try:
+            send_batch = getattr(self.device, "batch", None)
+            if send_batch is not None:
+                send_batch(ops)
+            else:
+                for op in ops:
+                    _BATCH_REPLAY[op["op"]](self.device, op)
+            logger.info(f"批量提交 {len(ops)} 个操作")
+        except Exception as e:
+            logger.error(f"批量操作执行失败: {e}")
+            raise IDBError(f"批量操作执行失败: {e}")
+
+    @_idb_rpc("获取设备信息")
     def get_device_info(self) -> Dict[str, Any]:
         """
         获取设备信息
@@ -287,21 +876,17 @@ class IDBAutomator:
         Returns:
             Dict[str, Any]: 设备信息字典
         """
-        if not self.is_connected():
-            raise IDBError("设备未连接")
+        return self.device.info()
 
-        try:
-            return self.device.info()
-        except Exception as e:
-            logger.error(f"获取设备信息失败: {e}")
-            raise IDBError(f"获取设备信息失败: {e}")
-
-    def app_start(self, bundle_id: str) -> bool:
+    def app_start(self, bundle_id: str, launch_timeout: float = 10.0) -> bool:
         """
         启动应用
 
+        启动后轮询当前前台应用，应用到达前台即返回，不再固定等待。
+
         Args:
             bundle_id: 应用包ID
+            launch_timeout: 等待应用到达前台的最长时间（秒）
 
         Returns:
             bool: 启动成功返回True，否则返回False
@@ -310,14 +895,69 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
+            self._elements_cache.clear()
             self.device.app_launch(bundle_id)
-            time.sleep(2)  # 等待应用启动
-            logger.info(f"应用 {bundle_id} 启动成功")
-            return True
         except Exception as e:
             logger.error(f"启动应用 {bundle_id} 失败: {e}")
             return False
 
+        # 轮询前台应用，退避间隔从50ms逐步增加到400ms
+        deadline = time.monotonic() + launch_timeout
+        delay = 0.05
+        while True:
+            try:
+                if self.device.app_current().get('bundle_id') == bundle_id:
+                    logger.info(f"应用 {bundle_id} 启动成功")
+                    return True
+            except (AttributeError, NotImplementedError):
+                # 客户端不支持查询前台应用，退回固定等待
+                time.sleep(2)
+                logger.info(f"应用 {bundle_id} 启动成功")
+                return True
+            except Exception:
+                pass
+            if time.monotonic() + delay > deadline:
+                break
+            time.sleep(delay)
+            delay = min(delay * 1.6, 0.4)
+
+        logger.error(f"应用 {bundle_id} 在 {launch_timeout} 秒内未进入前台")
+        return False
+
+    def wait_until(self, predicate: Callable[[], Any], timeout: float = 10.0,
+                   initial: float = 0.02, cap: float = 0.5) -> bool:
+        """
+        轮询等待条件成立，代替固定时长的sleep
+
+        轮询间隔从initial开始指数增长，最长为cap；条件通常在第一次轮询就已成立。
+
+        Args:
+            predicate: 无参条件函数，返回真值表示条件成立，抛出异常视为不成立
+            timeout: 最长等待时间（秒）
+            initial: 首次轮询间隔（秒）
+            cap: 最大轮询间隔（秒）
+
+        Returns:
+            bool: 条件在超时前成立返回True，否则返回False
+
+        Example:
+            >>> idb.press_key("home")
+            >>> idb.wait_until(lambda: idb.app_current().get("bundle_id") != bundle_id, timeout=3)
+        """
+        deadline = time.monotonic() + timeout
+        delay = initial
+        while True:
+            try:
+                if predicate():
+                    return True
+            except Exception as e:
+                logger.debug(f"等待条件检查出错: {e}")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, cap)
+
     def app_stop(self, bundle_id: str) -> bool:
         """
         停止应用
@@ -332,6 +972,7 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
+            self._elements_cache.clear()
             self.device.app_terminate(bundle_id)
             logger.info(f"应用 {bundle_id} 停止成功")
             return True
@@ -339,6 +980,7 @@ class IDBAutomator:
             logger.error(f"停止应用 {bundle_id} 失败: {e}")
             return False
 
+    @_idb_rpc("获取当前应用信息")
     def app_current(self) -> Dict[str, Any]:
         """
         获取当前应用信息
@@ -346,15 +988,9 @@ class IDBAutomator:
         Returns:
             Dict[str, Any]: 当前应用信息
         """
-        if not self.is_connected():
-            raise IDBError("设备未连接")
-
-        try:
-            return self.device.app_current()
-        except Exception as e:
-            logger.error(f"获取当前应用信息失败: {e}")
-            raise IDBError(f"获取当前应用信息失败: {e}")
+        return self.device.app_current()
 
+    @_idb_rpc("获取应用列表")
     def app_list(self) -> List[Dict[str, Any]]:
         """
         获取应用列表
@@ -362,15 +998,44 @@ class IDBAutomator:
         Returns:
             List[Dict[str, Any]]: 应用列表
         """
-        if not self.is_connected():
-            raise IDBError("设备未连接")
+        return self.device.list_apps()
 
-        try:
-            return self.device.list_apps()
-        except Exception as e:
-            logger.error(f"获取应用列表失败: {e}")
-            raise IDBError(f"获取应用列表失败: {e}")
+    def _cached_find_elements(self, element_type: str, predicate: Optional[str] = None,
+                              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        获取元素快照，在有效期内复用上一次相同查询的结果
+
+        Args:
+            element_type: 元素类型
+            predicate: 设备端过滤条件（NSPredicate），None表示获取该类型的全部元素
+            limit: 最大返回数量，仅在客户端支持时生效
 
+        Returns:
+            List[Dict[str, Any]]: 元素列表
+        """
+        return self._cached_element_table(element_type, predicate, limit).rows
+
+    def _cached_element_table(self, element_type: str, predicate: Optional[str] = None,
+                              limit: Optional[int] = None) -> _ElementTable:
+        """同_cached_find_elements，返回按列视图供本地过滤使用"""
+        key = (element_type, predicate, limit)
+        now = time.monotonic()
+        cached = self._elements_cache.get(key)
+        if cached is not None and now - cached[0] < self._elements_cache_ttl:
+            return cached[1]
+
+        if predicate is None:
+            elements = self.device.find_elements(element_type)
+        elif limit is not None and "limit" in self._find_params:
+            elements = self.device.find_elements(element_type, predicate=predicate, limit=limit)
+        else:
+            elements = self.device.find_elements(element_type, predicate=predicate)
+        _annotate_centers(elements)
+        table = _ElementTable(elements)
+        self._elements_cache[key] = (now, table)
+        return table
+
+    @_idb_rpc("查找元素")
     def find_element(self, element_type: str, label: Optional[str] = None, 
                     name: Optional[str] = None, **kwargs) -> Optional[Dict[str, Any]]:
         """
@@ -385,35 +1050,25 @@ class IDBAutomator:
         Returns:
             Optional[Dict[str, Any]]: 找到的元素信息，未找到返回None
         """
-        if not self.is_connected():
-            raise IDBError("设备未连接")
-
-        try:
-            elements = self.device.find_elements(element_type)
-            
-            # 根据条件过滤元素
-            for element in elements:
-                if label and element.get('label') != label:
-                    continue
-                if name and element.get('name') != name:
-                    continue
-                
-                # 检查其他条件
-                match = True
-                for key, value in kwargs.items():
-                    if element.get(key) != value:
-                        match = False
-                        break
-                
-                if match:
-                    return element
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"查找元素失败: {e}")
-            raise IDBError(f"查找元素失败: {e}")
-
+        # 客户端支持且条件都能表示为NSPredicate时由设备端完成匹配，只返回第一个匹配元素
+        if "predicate" in self._find_params:
+            predicate = _build_predicate(element_type, label, name, **kwargs)
+            if predicate is not None:
+                elements = self._cached_find_elements(element_type, predicate, limit=1)
+                return elements[0] if elements else None
+
+        table = self._cached_element_table(element_type)
+
+        # 根据条件过滤元素
+        conditions = dict(kwargs)
+        if label:
+            conditions['label'] = label
+        if name:
+            conditions['name'] = name
+        indices = table.match(conditions)
+        return table.rows[indices[0]] if indices else None
+
+    @_idb_rpc("查找元素")
     def find_elements(self, element_type: str, **kwargs) -> List[Dict[str, Any]]:
         """
         查找多个元素
@@ -425,29 +1080,14 @@ class IDBAutomator:
         Returns:
             List[Dict[str, Any]]: 找到的元素列表
         """
-        if not self.is_connected():
-            raise IDBError("设备未连接")
+        # 客户端支持且条件都能表示为NSPredicate时由设备端完成匹配
+        if "predicate" in self._find_params:
+            predicate = _build_predicate(element_type, **kwargs)
+            if predicate is not None:
+                return list(self._cached_find_elements(element_type, predicate))
 
-        try:
-            elements = self.device.find_elements(element_type)
-            
-            # 根据条件过滤元素
-            filtered_elements = []
-            for element in elements:
-                match = True
-                for key, value in kwargs.items():
-                    if element.get(key) != value:
-                        match = False
-                        break
-                
-                if match:
-                    filtered_elements.append(element)
-            
-            return filtered_elements
-            
-        except Exception as e:
-            logger.error(f"查找元素失败: {e}")
-            raise IDBError(f"查找元素失败: {e}")
+        # 根据条件过滤元素
+        return self._cached_element_table(element_type).filter(kwargs)
 
     def tap(self, x: int, y: int) -> bool:
         """
@@ -463,9 +1103,14 @@ class IDBAutomator:
         if not self.is_connected():
             raise IDBError("设备未连接")
 
+        if self._batch_queue is not None:
+            self._enqueue_batch_op({"op": "tap", "x": x, "y": y})
+            return True
+
         try:
+            self._elements_cache.clear()
             self.device.tap((x, y))
-            logger.info(f"点击坐标 ({x}, {y})")
+            logger.info("点击坐标 (%s, %s)", x, y)
             return True
         except Exception as e:
             logger.error(f"点击坐标 ({x}, {y}) 失败: {e}")
@@ -485,12 +1130,16 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
-            bounds = element.get('bounds', {})
-            center_x = bounds.get('x', 0) + bounds.get('width', 0) // 2
-            center_y = bounds.get('y', 0) + bounds.get('height', 0) // 2
+            center = element.get('_center')
+            if center is None:
+                bounds = element.get('bounds', {})
+                center = (bounds.get('x', 0) + bounds.get('width', 0) // 2,
+                          bounds.get('y', 0) + bounds.get('height', 0) // 2)
             
-            self.device.tap((center_x, center_y))
-            logger.info(f"点击元素: {element.get('label', element.get('name', 'Unknown'))}")
+            self._elements_cache.clear()
+            self.device.tap(center)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("点击元素: %s", element.get('label', element.get('name', 'Unknown')))
             return True
         except Exception as e:
             logger.error(f"点击元素失败: {e}")
@@ -512,8 +1161,9 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
+            self._elements_cache.clear()
             self.device.long_press((x, y), duration=duration)
-            logger.info(f"长按坐标 ({x}, {y}) {duration}秒")
+            logger.info("长按坐标 (%s, %s) %s秒", x, y, duration)
             return True
         except Exception as e:
             logger.error(f"长按坐标 ({x}, {y}) 失败: {e}")
@@ -537,9 +1187,21 @@ class IDBAutomator:
         if not self.is_connected():
             raise IDBError("设备未连接")
 
+        if self._batch_queue is not None:
+            self._enqueue_batch_op({
+                "op": "swipe",
+                "start_x": start_x,
+                "start_y": start_y,
+                "end_x": end_x,
+                "end_y": end_y,
+                "duration": duration,
+            })
+            return True
+
         try:
+            self._elements_cache.clear()
             self.device.swipe((start_x, start_y), (end_x, end_y), duration=duration)
-            logger.info(f"滑动从 ({start_x}, {start_y}) 到 ({end_x}, {end_y})")
+            logger.info("滑动从 (%s, %s) 到 (%s, %s)", start_x, start_y, end_x, end_y)
             return True
         except Exception as e:
             logger.error(f"滑动操作失败: {e}")
@@ -558,9 +1220,14 @@ class IDBAutomator:
         if not self.is_connected():
             raise IDBError("设备未连接")
 
+        if self._batch_queue is not None:
+            self._enqueue_batch_op({"op": "input_text", "text": text})
+            return True
+
         try:
+            self._elements_cache.clear()
             self.device.input_text(text)
-            logger.info(f"输入文本: {text}")
+            logger.info("输入文本: %s", text)
             return True
         except Exception as e:
             logger.error(f"输入文本失败: {e}")
@@ -577,6 +1244,7 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
+            self._elements_cache.clear()
             self.device.clear_text()
             logger.info("清除文本")
             return True
@@ -597,20 +1265,32 @@ class IDBAutomator:
         if not self.is_connected():
             raise IDBError("设备未连接")
 
+        if self._batch_queue is not None:
+            self._enqueue_batch_op({"op": "press_key", "key": key})
+            return True
+
         try:
+            self._elements_cache.clear()
+            if "rotate" in key.lower():
+                self._orientation_epoch += 1
             self.device.press_key(key)
-            logger.info(f"按键: {key}")
+            logger.info("按键: %s", key)
             return True
         except Exception as e:
             logger.error(f"按键 {key} 失败: {e}")
             return False
 
-    def screenshot(self, save_path: Optional[str] = None) -> Optional[str]:
+    def screenshot(self, save_path: Optional[str] = None, fmt: str = "png",
+                   quality: int = 85, background: bool = False) -> Optional[str]:
         """
         截图
 
         Args:
             save_path: 保存路径，如果为None则自动生成
+            fmt: 保存格式，png（无损）或jpeg（编码更快、文件更小）
+            quality: JPEG质量，仅fmt为jpeg时生效
+            background: 为True时编码和写文件在后台线程完成，立即返回路径，
+                可通过flush_screenshots()等待写入完成
 
         Returns:
             Optional[str]: 保存的文件路径，失败返回None
@@ -618,20 +1298,69 @@ class IDBAutomator:
         if not self.is_connected():
             raise IDBError("设备未连接")
 
+        fmt = fmt.lower()
+        if fmt not in ("png", "jpeg", "jpg"):
+            raise ValueError(f"不支持的截图格式: {fmt}")
+
         try:
             screenshot = self.device.screenshot()
             
             if save_path is None:
                 timestamp = int(time.time())
-                save_path = f"screenshot_{timestamp}.png"
-            
-            screenshot.save(save_path)
+                save_path = f"screenshot_{timestamp}.{'png' if fmt == 'png' else 'jpg'}"
+
+            if background:
+                if self._io_pool is None:
+                    self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="idb-screenshot")
+                future = self._io_pool.submit(_save_screenshot, screenshot, save_path, fmt, quality)
+                future.add_done_callback(functools.partial(_log_screenshot_saved, save_path))
+                return save_path
+
+            _save_screenshot(screenshot, save_path, fmt, quality)
             logger.info(f"截图保存到: {save_path}")
             return save_path
         except Exception as e:
             logger.error(f"截图失败: {e}")
             return None
 
+    def screenshot_raw(self, save_path: Optional[str] = None) -> Optional[str]:
+        """
+        截图并将客户端返回的PNG数据直接写入文件
+
+        不需要图像对象时使用：跳过解码再重新编码PNG的过程，按64KB分块写入。
+        客户端返回的是图像对象而非已编码数据时，退回按PNG保存。
+
+        Args:
+            save_path: 保存路径，如果为None则自动生成
+
+        Returns:
+            Optional[str]: 保存的文件路径，失败返回None
+        """
+        if not self.is_connected():
+            raise IDBError("设备未连接")
+
+        try:
+            screenshot = self.device.screenshot()
+
+            if save_path is None:
+                save_path = f"screenshot_{int(time.time())}.png"
+
+            if hasattr(screenshot, "save"):
+                _save_screenshot(screenshot, save_path, "png", 0)
+            else:
+                _write_screenshot_bytes(screenshot, save_path)
+            logger.info(f"截图保存到: {save_path}")
+            return save_path
+        except Exception as e:
+            logger.error(f"截图失败: {e}")
+            return None
+
+    def flush_screenshots(self) -> None:
+        """等待所有后台保存中的截图写入完成"""
+        if self._io_pool is not None:
+            self._io_pool.shutdown(wait=True)
+            self._io_pool = None
+
     def file_push(self, local_path: str, device_path: str) -> bool:
         """
         上传文件到设备
@@ -647,7 +1376,10 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
-            self.device.file_push(local_path, device_path)
+            if _accepts_chunk_size(type(self.device), "file_push"):
+                self.device.file_push(local_path, device_path, chunk_size=_FILE_CHUNK_SIZE)
+            else:
+                self.device.file_push(local_path, device_path)
             logger.info(f"文件上传成功: {local_path} -> {device_path}")
             return True
         except Exception as e:
@@ -669,13 +1401,17 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
-            self.device.file_pull(device_path, local_path)
+            if _accepts_chunk_size(type(self.device), "file_pull"):
+                self.device.file_pull(device_path, local_path, chunk_size=_FILE_CHUNK_SIZE)
+            else:
+                self.device.file_pull(device_path, local_path)
             logger.info(f"文件下载成功: {device_path} -> {local_path}")
             return True
         except Exception as e:
             logger.error(f"文件下载失败: {e}")
             return False
 
+    @_idb_rpc("列出文件")
     def file_list(self, device_path: str) -> List[Dict[str, Any]]:
         """
         列出设备文件
@@ -686,14 +1422,7 @@ class IDBAutomator:
         Returns:
             List[Dict[str, Any]]: 文件列表
         """
-        if not self.is_connected():
-            raise IDBError("设备未连接")
-
-        try:
-            return self.device.file_list(device_path)
-        except Exception as e:
-            logger.error(f"列出文件失败: {e}")
-            raise IDBError(f"列出文件失败: {e}")
+        return self.device.file_list(device_path)
 
     def start_video_recording(self, output_path: str) -> bool:
         """
@@ -734,6 +1463,23 @@ class IDBAutomator:
             logger.error(f"停止录屏失败: {e}")
             return False
 
+    def _start_stream(self, kind: str) -> None:
+        """idb客户端提供订阅流时开始后台消费，否则保持按需轮询"""
+        method, maxlen = _MONITOR_STREAMS[kind]
+        subscribe = getattr(self.device, method, None)
+        if subscribe is None or kind in self._streams:
+            return
+        if self._monitor_hub is None:
+            self._monitor_hub = _MonitorHub()
+        stream = _MonitorStream(kind, subscribe(), maxlen)
+        stream.start(self._monitor_hub)
+        self._streams[kind] = stream
+
+    def _stop_stream(self, kind: str) -> None:
+        stream = self._streams.pop(kind, None)
+        if stream is not None:
+            stream.stop()
+
     def start_network_monitoring(self) -> bool:
         """
         开始网络监控
@@ -746,6 +1492,7 @@ class IDBAutomator:
 
         try:
             self.device.network_start_monitoring()
+            self._start_stream("network")
             logger.info("开始网络监控")
             return True
         except Exception as e:
@@ -763,6 +1510,7 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
+            self._stop_stream("network")
             self.device.network_stop_monitoring()
             logger.info("停止网络监控")
             return True
@@ -770,6 +1518,7 @@ class IDBAutomator:
             logger.error(f"停止网络监控失败: {e}")
             return False
 
+    @_idb_rpc("获取网络统计")
     def get_network_stats(self) -> Dict[str, Any]:
         """
         获取网络统计信息
@@ -777,14 +1526,13 @@ class IDBAutomator:
         Returns:
             Dict[str, Any]: 网络统计信息
         """
-        if not self.is_connected():
-            raise IDBError("设备未连接")
+        stream = self._streams.get("network")
+        if stream is not None:
+            stats = stream.latest()
+            if stats is not None:
+                return stats
 
-        try:
-            return self.device.network_get_stats()
-        except Exception as e:
-            logger.error(f"获取网络统计失败: {e}")
-            raise IDBError(f"获取网络统计失败: {e}")
+        return self.device.network_get_stats()
 
     def start_performance_monitoring(self) -> bool:
         """
@@ -798,6 +1546,7 @@ class IDBAutomator:
 
         try:
             self.device.performance_start_monitoring()
+            self._start_stream("performance")
             logger.info("开始性能监控")
             return True
         except Exception as e:
@@ -815,6 +1564,7 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
+            self._stop_stream("performance")
             self.device.performance_stop_monitoring()
             logger.info("停止性能监控")
             return True
@@ -822,6 +1572,7 @@ class IDBAutomator:
             logger.error(f"停止性能监控失败: {e}")
             return False
 
+    @_idb_rpc("获取性能数据")
     def get_performance_data(self) -> Dict[str, Any]:
         """
         获取性能数据
@@ -829,14 +1580,13 @@ class IDBAutomator:
         Returns:
             Dict[str, Any]: 性能数据
         """
-        if not self.is_connected():
-            raise IDBError("设备未连接")
+        stream = self._streams.get("performance")
+        if stream is not None:
+            data = stream.latest()
+            if data is not None:
+                return data
 
-        try:
-            return self.device.performance_get_data()
-        except Exception as e:
-            logger.error(f"获取性能数据失败: {e}")
-            raise IDBError(f"获取性能数据失败: {e}")
+        return self.device.performance_get_data()
 
     def start_log_monitoring(self) -> bool:
         """
@@ -850,6 +1600,7 @@ class IDBAutomator:
 
         try:
             self.device.log_start_monitoring()
+            self._start_stream("logs")
             logger.info("开始日志监控")
             return True
         except Exception as e:
@@ -867,6 +1618,7 @@ class IDBAutomator:
             raise IDBError("设备未连接")
 
         try:
+            self._stop_stream("logs")
             self.device.log_stop_monitoring()
             logger.info("停止日志监控")
             return True
@@ -874,21 +1626,30 @@ class IDBAutomator:
             logger.error(f"停止日志监控失败: {e}")
             return False
 
+    @_idb_rpc("获取日志")
     def get_logs(self) -> List[Dict[str, Any]]:
         """
         获取日志
 
+        已开启流式监控时返回自上次调用以来的新日志。
+
         Returns:
             List[Dict[str, Any]]: 日志列表
         """
-        if not self.is_connected():
-            raise IDBError("设备未连接")
+        stream = self._streams.get("logs")
+        if stream is not None:
+            return stream.drain()
 
-        try:
-            return self.device.log_get_logs()
-        except Exception as e:
-            logger.error(f"获取日志失败: {e}")
-            raise IDBError(f"获取日志失败: {e}")
+        return self.device.log_get_logs()
+
+
+# 方向滑动的起止点相对屏幕尺寸的比例：(start_x, start_y, end_x, end_y)
+_SWIPE_RATIOS = {
+    "left": (0.8, 0.5, 0.2, 0.5),
+    "right": (0.2, 0.5, 0.8, 0.5),
+    "up": (0.5, 0.8, 0.5, 0.2),
+    "down": (0.5, 0.2, 0.5, 0.8),
+}
 
 
 class IDBWebViewAgent:
@@ -907,6 +1668,22 @@ class IDBWebViewAgent:
             idb_automator: IDB自动化控制器实例
         """
         self.idb = idb_automator
+        # 屏幕信息缓存，屏幕尺寸在旋转前不会变化，避免每次滑动都请求一次设备信息
+        self._screen_info: Optional[Dict] = None
+        self._screen_info_key: Optional[Tuple[int, int]] = None  # (设备对象id, 方向变化计数)
+        self._swipe_presets: Dict[str, Tuple[int, int, int, int]] = {}  # 按当前屏幕尺寸预计算的滑动坐标
+
+    def invalidate_screen_info(self) -> None:
+        """使屏幕信息缓存失效（屏幕方向变化后调用）"""
+        self._screen_info = None
+        self._screen_info_key = None
+        self._swipe_presets = {}
+
+    def _swipe(self, direction: str, duration: float) -> bool:
+        """按预计算的坐标执行方向滑动"""
+        if not self.get_screen_info():
+            return False
+        return self.idb.swipe(*self._swipe_presets[direction], duration)
 
     def find_webview(self) -> Optional[Dict[str, Any]]:
         """
@@ -996,17 +1773,7 @@ class IDBWebViewAgent:
         Returns:
             bool: 操作是否成功
         """
-        screen_info = self.get_screen_info()
-        if not screen_info:
-            return False
-            
-        width = screen_info['width']
-        height = screen_info['height']
-        start_x = int(width * 0.8)
-        end_x = int(width * 0.2)
-        start_y = int(height * 0.5)
-        
-        return self.swipe(start_x, start_y, end_x, start_y, duration)
+        return self._swipe("left", duration)
 
     def swipe_right(self, duration: float = 1.0) -> bool:
         """
@@ -1018,17 +1785,7 @@ class IDBWebViewAgent:
         Returns:
             bool: 操作是否成功
         """
-        screen_info = self.get_screen_info()
-        if not screen_info:
-            return False
-            
-        width = screen_info['width']
-        height = screen_info['height']
-        start_x = int(width * 0.2)
-        end_x = int(width * 0.8)
-        start_y = int(height * 0.5)
-        
-        return self.swipe(start_x, start_y, end_x, start_y, duration)
+        return self._swipe("right", duration)
 
     def swipe_up(self, duration: float = 1.0) -> bool:
         """
@@ -1040,17 +1797,7 @@ class IDBWebViewAgent:
         Returns:
             bool: 操作是否成功
         """
-        screen_info = self.get_screen_info()
-        if not screen_info:
-            return False
-            
-        width = screen_info['width']
-        height = screen_info['height']
-        start_x = int(width * 0.5)
-        start_y = int(height * 0.8)
-        end_y = int(height * 0.2)
-        
-        return self.swipe(start_x, start_y, start_x, end_y, duration)
+        return self._swipe("up", duration)
 
     def swipe_down(self, duration: float = 1.0) -> bool:
         """
@@ -1062,17 +1809,7 @@ class IDBWebViewAgent:
         Returns:
             bool: 操作是否成功
         """
-        screen_info = self.get_screen_info()
-        if not screen_info:
-            return False
-            
-        width = screen_info['width']
-        height = screen_info['height']
-        start_x = int(width * 0.5)
-        start_y = int(height * 0.2)
-        end_y = int(height * 0.8)
-        
-        return self.swipe(start_x, start_y, start_x, end_y, duration)
+        return self._swipe("down", duration)
 
     def wait_for_element(self, element_type: str, timeout: float = 10.0, **kwargs) -> Optional[Dict]:
         """
@@ -1086,17 +1823,88 @@ class IDBWebViewAgent:
         Returns:
             Optional[Dict]: 找到的元素信息，未找到返回None
         """
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            element = self.find_element(element_type, **kwargs)
-            if element:
-                return element
-            time.sleep(0.5)
-        
+        deadline = time.monotonic() + timeout
+        delay = 0.025
+        stop = threading.Event()
+        mutated, events = self._watch_ax_events(stop)
+
+        try:
+            while True:
+                element = self.idb.find_element(element_type, **kwargs)
+                if element:
+                    return element
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                # 指数退避（25ms -> 500ms）；支持无障碍事件时界面变化会提前唤醒
+                wait = min(delay, remaining)
+                if mutated is None:
+                    time.sleep(wait)
+                    # 丢弃快照缓存，确保下一次轮询真正查询设备
+                    self.idb.invalidate_element_cache()
+                elif mutated.wait(wait):
+                    mutated.clear()
+                    self.idb.invalidate_element_cache()
+                delay = min(delay * 1.8, 0.5)
+        finally:
+            stop.set()
+            if events is not None:
+                # 界面空闲时监听线程会一直阻塞在下一个事件上，需主动关闭订阅使其退出
+                self._close_ax_events(events)
+
         logger.warning(f"等待元素超时: {element_type}, {kwargs}")
         return None
 
+    def _watch_ax_events(self, stop: threading.Event) -> Tuple[Optional[threading.Event], Any]:
+        """
+        订阅设备的无障碍事件（需idb客户端提供subscribe_ax_events），界面变化时置位事件
+
+        Args:
+            stop: 停止订阅的信号
+
+        Returns:
+            Tuple[Optional[threading.Event], Any]: (界面变化事件, 事件订阅)，
+            客户端不支持订阅或订阅失败时均为None；订阅需由调用方通过_close_ax_events关闭
+        """
+        subscribe = getattr(self.idb.device, "subscribe_ax_events", None)
+        if subscribe is None:
+            return None, None
+
+        try:
+            events = subscribe()
+        except Exception as e:
+            logger.debug(f"无障碍事件订阅失败: {e}")
+            return None, None
+
+        mutated = threading.Event()
+
+        def listener():
+            try:
+                for _ in events:
+                    if stop.is_set():
+                        break
+                    mutated.set()
+            except Exception as e:
+                logger.debug(f"无障碍事件订阅结束: {e}")
+
+        threading.Thread(target=listener, daemon=True, name="IDB-AXEvents").start()
+        return mutated, events
+
+    @staticmethod
+    def _close_ax_events(events: Any) -> None:
+        """关闭无障碍事件订阅，流式调用优先取消（可跨线程中断阻塞中的迭代）"""
+        for name in ("cancel", "close"):
+            close = getattr(events, name, None)
+            if close is None:
+                continue
+            try:
+                close()
+                return
+            except Exception as e:
+                logger.debug(f"关闭无障碍事件订阅失败: {e}")
+
     def element_exists(self, element_type: str, **kwargs) -> bool:
         """
         检查元素是否存在（类似uiautomator2的d(text="登录").exists）
@@ -1108,7 +1916,7 @@ class IDBWebViewAgent:
         Returns:
             bool: 元素是否存在
         """
-        element = self.find_element(element_type, **kwargs)
+        element = self.idb.find_element(element_type, **kwargs)
         return element is not None
 
     def get_element_info(self, element_type: str, **kwargs) -> Optional[Dict]:
@@ -1122,7 +1930,7 @@ class IDBWebViewAgent:
         Returns:
             Optional[Dict]: 元素信息
         """
-        return self.find_element(element_type, **kwargs)
+        return self.idb.find_element(element_type, **kwargs)
 
     def get_screen_info(self) -> Optional[Dict]:
         """
@@ -1131,18 +1939,30 @@ class IDBWebViewAgent:
         Returns:
             Optional[Dict]: 屏幕信息
         """
-        if not self.is_connected():
+        if not self.idb.is_connected():
             raise IDBError("设备未连接")
+
+        # 重连（设备对象变化）或方向变化后缓存自动失效
+        key = (id(self.idb.device), self.idb._orientation_epoch)
+        if self._screen_info is not None and self._screen_info_key == key:
+            return self._screen_info
             
         try:
             # 获取设备信息
-            device_info = self.get_device_info()
-            return {
+            device_info = self.idb.get_device_info()
+            self._screen_info = {
                 'width': device_info.get('screen_width', 0),
                 'height': device_info.get('screen_height', 0),
                 'scale': device_info.get('screen_scale', 1.0),
                 'orientation': device_info.get('orientation', 'portrait')
             }
+            self._screen_info_key = key
+            width, height = self._screen_info['width'], self._screen_info['height']
+            self._swipe_presets = {
+                direction: (int(width * sx), int(height * sy), int(width * ex), int(height * ey))
+                for direction, (sx, sy, ex, ey) in _SWIPE_RATIOS.items()
+            }
+            return self._screen_info
         except Exception as e:
             logger.error(f"获取屏幕信息失败: {e}")
             return None
@@ -1278,3 +2098,87 @@ class IDBWebViewAgent:
         except Exception as e:
             logger.error(f"向元素输入文本失败: {e}")
             return False
+
+
+class AsyncIDBAutomator:
+    """
+    IDBAutomator的异步封装
+
+    每个实例绑定一个单线程执行器，同一设备上的RPC按顺序执行（idb设备对象
+    不保证线程安全），不同设备的RPC在同一个事件循环中并发，
+    M台设备的总耗时由M倍单次延迟降为约一次延迟。
+
+    Example:
+        >>> devices = [AsyncIDBAutomator(udid) for udid in udids]
+        >>> await gather_many(d.aconnect() for d in devices)
+        >>> infos = await gather_many(d.aget_device_info() for d in devices)
+    """
+
+    def __init__(self, udid: str, host: str = "localhost", port: int = 8080,
+                 automator: Optional[IDBAutomator] = None):
+        """
+        初始化异步控制器
+
+        Args:
+            udid: 设备UDID
+            host: IDB Companion服务主机地址
+            port: IDB Companion服务端口
+            automator: 已有的IDBAutomator实例，提供时忽略udid/host/port
+        """
+        self.automator = automator or IDBAutomator(udid, host, port)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def _call(self, func, *args, **kwargs) -> Any:
+        """在设备专属线程中执行同步调用"""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def aconnect(self, retry_count: int = 3, retry_interval: float = 2.0) -> bool:
+        """异步连接设备"""
+        return await self._call(self.automator.connect, retry_count, retry_interval)
+
+    async def adisconnect(self) -> None:
+        """异步断开连接并释放执行线程"""
+        try:
+            await self._call(self.automator.disconnect)
+        finally:
+            self._executor.shutdown(wait=False)
+
+    async def atap(self, x: int, y: int) -> bool:
+        """异步点击坐标"""
+        return await self._call(self.automator.tap, x, y)
+
+    async def afind_element(self, element_type: str, label: Optional[str] = None,
+                            name: Optional[str] = None, **kwargs) -> Optional[Dict[str, Any]]:
+        """异步查找单个元素"""
+        return await self._call(self.automator.find_element, element_type, label, name, **kwargs)
+
+    async def afind_elements(self, element_type: str, **kwargs) -> List[Dict[str, Any]]:
+        """异步查找多个元素"""
+        return await self._call(self.automator.find_elements, element_type, **kwargs)
+
+    async def aget_device_info(self) -> Dict[str, Any]:
+        """异步获取设备信息"""
+        return await self._call(self.automator.get_device_info)
+
+    async def aapp_list(self) -> List[Dict[str, Any]]:
+        """异步获取已安装应用列表"""
+        return await self._call(self.automator.app_list)
+
+    async def aget_performance_data(self) -> Dict[str, Any]:
+        """异步获取性能数据"""
+        return await self._call(self.automator.get_performance_data)
+
+
+async def gather_many(actions, return_exceptions: bool = False) -> List[Any]:
+    """
+    并发执行多个设备上的异步操作
+
+    Args:
+        actions: 协程的可迭代对象，如 (d.atap(100, 200) for d in devices)
+        return_exceptions: 为True时异常作为结果返回而不是直接抛出
+
+    Returns:
+        List[Any]: 与actions顺序一致的结果列表
+    """
+    return await asyncio.gather(*actions, return_exceptions=return_exceptions)
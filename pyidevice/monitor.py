@@ -1,23 +1,40 @@
 """设备监控模块"""
 
-import time
 import threading
 import logging
-from typing import Dict, List, Optional, Callable, Any
-from dataclasses import dataclass
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Callable, Any, Tuple
+from dataclasses import dataclass, fields
 from datetime import datetime
+from .device import Device
 from .exceptions import DeviceError, DeviceConnectionError
-from .types import DeviceStatus
+from .types import DeviceStatus, add_slots
 
 logger = logging.getLogger(__name__)
 
+_now = time.time
+
+# 设备信息字段解析表：(DeviceMetrics字段, 设备信息键, 类型转换, 缺省值)
+_FIELD_SPECS = (
+    ("battery_level", "BatteryLevel", int, -1),
+    ("memory_usage", "MemoryUsage", float, 0.0),
+    ("cpu_usage", "CPUUsage", float, 0.0),
+    ("network_status", "NetworkStatus", str, "unknown"),
+    ("temperature", "Temperature", float, None),
+    ("storage_free", "StorageFree", int, None),
+    ("storage_total", "StorageTotal", int, None),
+)
 
+
+@add_slots
 @dataclass
 class DeviceMetrics:
-    """设备指标数据类"""
+    """设备指标数据类，timestamp为采集时刻的epoch秒数"""
 
     udid: str
-    timestamp: datetime
+    timestamp: float
     status: DeviceStatus
     battery_level: int
     memory_usage: float
@@ -27,6 +44,54 @@ class DeviceMetrics:
     storage_free: Optional[int] = None
     storage_total: Optional[int] = None
 
+    @property
+    def timestamp_dt(self) -> datetime:
+        """采集时刻的datetime表示，按需转换"""
+        return datetime.fromtimestamp(self.timestamp)
+
+
+@add_slots
+@dataclass
+class AlertRule:
+    """告警规则"""
+
+    name: str
+    condition: Callable[[DeviceMetrics], bool]
+    message: str
+    severity: str
+
+
+@add_slots
+@dataclass
+class AlertEvent(Mapping):
+    """
+    告警事件，传给告警回调
+
+    实现只读映射协议，原先按字典使用的回调（alert_data["message"]、get、in、items等）无需修改。
+    """
+
+    name: str
+    message: str
+    severity: str
+    device_udid: str
+    timestamp: datetime
+    metrics: DeviceMetrics
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _ALERT_EVENT_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_ALERT_EVENT_KEYS)
+
+    def __len__(self) -> int:
+        return len(_ALERT_EVENT_KEYS)
+
+
+# AlertEvent作为映射时的键，与字段顺序一致
+_ALERT_EVENT_KEYS = tuple(f.name for f in fields(AlertEvent))
+
 
 class DeviceMonitor:
     """设备监控器"""
@@ -39,12 +104,20 @@ class DeviceMonitor:
             interval: 监控间隔（秒）
         """
         self.interval = interval
-        self.monitoring = False
+        self._stop = threading.Event()
+        self._stop.set()
         self.monitor_thread = None
+        self._pool: Optional[ThreadPoolExecutor] = None  # 并行收集各设备指标的线程池
+        self._device_cache: Dict[str, Device] = {}  # 按UDID复用的设备对象，避免每轮重新创建
         self.devices: Dict[str, DeviceMetrics] = {}
         self.callbacks: List[Callable[[DeviceMetrics], None]] = []
         self._lock = threading.Lock()
 
+    @property
+    def monitoring(self) -> bool:
+        """是否正在监控"""
+        return not self._stop.is_set()
+
     def add_callback(self, callback: Callable[[DeviceMetrics], None]):
         """添加监控回调函数"""
         with self._lock:
@@ -67,7 +140,10 @@ class DeviceMonitor:
             logger.warning("监控已在运行中")
             return
 
-        self.monitoring = True
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(
+            max_workers=min(32, max(1, len(udids))), thread_name_prefix="DeviceMonitor"
+        )
         self.monitor_thread = threading.Thread(
             target=self._monitor_loop, args=(udids,), daemon=True
         )
@@ -79,44 +155,64 @@ class DeviceMonitor:
         if not self.monitoring:
             return
 
-        self.monitoring = False
+        self._stop.set()
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
         logger.info("设备监控已停止")
 
     def _monitor_loop(self, udids: List[str]):
         """监控循环"""
-        while self.monitoring:
+        pool = self._pool
+        # 上一轮超时仍未完成的收集任务，完成前不再为该设备提交新任务
+        pending: Dict[str, Any] = {}
+        while not self._stop.is_set():
             try:
+                # 各设备的指标收集并行执行，一轮耗时取决于最慢的设备而不是所有设备之和
+                futures = {}
                 for udid in udids:
-                    if not self.monitoring:
-                        break
-
-                    try:
-                        metrics = self._collect_device_metrics(udid)
-                        if metrics:
-                            self._update_device_metrics(metrics)
-                            self._notify_callbacks(metrics)
-                    except Exception as e:
-                        logger.error(f"收集设备 {udid} 指标失败: {e}")
-
-                time.sleep(self.interval)
+                    future = pending.pop(udid, None)
+                    if future is None or future.done():
+                        future = pool.submit(self._collect_device_metrics, udid)
+                    futures[future] = udid
+
+                try:
+                    for future in as_completed(futures, timeout=self.interval):
+                        udid = futures[future]
+                        try:
+                            metrics = future.result()
+                            if metrics:
+                                self._update_device_metrics(metrics)
+                                self._notify_callbacks(metrics)
+                        except Exception as e:
+                            logger.error(f"收集设备 {udid} 指标失败: {e}")
+                except FuturesTimeoutError:
+                    for future, udid in futures.items():
+                        if not future.done():
+                            pending[udid] = future
+                    logger.warning(f"{len(pending)} 台设备的指标收集超时")
+
+                if self._stop.wait(self.interval):
+                    break
             except Exception as e:
                 logger.error(f"监控循环错误: {e}")
-                time.sleep(self.interval)
+                if self._stop.wait(self.interval):
+                    break
 
     def _collect_device_metrics(self, udid: str) -> Optional[DeviceMetrics]:
         """收集设备指标"""
         try:
-            from .device import Device
-
-            device = Device(udid)
+            device = self._device_cache.get(udid)
+            if device is None:
+                device = self._device_cache[udid] = Device(udid)
 
             # 检查设备连接状态
             if not device.is_connected():
                 return DeviceMetrics(
                     udid=udid,
-                    timestamp=datetime.now(),
+                    timestamp=_now(),
                     status=DeviceStatus.DISCONNECTED,
                     battery_level=-1,
                     memory_usage=0.0,
@@ -127,36 +223,25 @@ class DeviceMonitor:
             # 获取设备信息
             info = device.info()
 
-            # 解析指标
-            battery_level = int(info.get("BatteryLevel", -1))
-            memory_usage = float(info.get("MemoryUsage", 0.0))
-            cpu_usage = float(info.get("CPUUsage", 0.0))
-            network_status = info.get("NetworkStatus", "unknown")
-            temperature = info.get("Temperature")
-            if temperature:
-                temperature = float(temperature)
-
-            storage_free = info.get("StorageFree")
-            if storage_free:
-                storage_free = int(storage_free)
-
-            storage_total = info.get("StorageTotal")
-            if storage_total:
-                storage_total = int(storage_total)
+            # 按解析表一次遍历完成所有字段的取值与类型转换
+            get = info.get
+            parsed = {}
+            for field, key, cast, default in _FIELD_SPECS:
+                value = get(key)
+                parsed[field] = default if value is None or value == "" else cast(value)
 
             return DeviceMetrics(
                 udid=udid,
-                timestamp=datetime.now(),
+                timestamp=_now(),
                 status=DeviceStatus.CONNECTED,
-                battery_level=battery_level,
-                memory_usage=memory_usage,
-                cpu_usage=cpu_usage,
-                network_status=network_status,
-                temperature=temperature,
-                storage_free=storage_free,
-                storage_total=storage_total,
+                **parsed,
             )
 
+        except DeviceConnectionError as e:
+            # 连接异常时丢弃缓存的设备对象，下一轮重新创建
+            self._device_cache.pop(udid, None)
+            logger.error(f"收集设备 {udid} 指标时出错: {e}")
+            return None
         except Exception as e:
             logger.error(f"收集设备 {udid} 指标时出错: {e}")
             return None
@@ -168,12 +253,14 @@ class DeviceMonitor:
 
     def _notify_callbacks(self, metrics: DeviceMetrics):
         """通知回调函数"""
+        # 只在复制回调列表时持锁，回调执行期间不阻塞其他线程
         with self._lock:
-            for callback in self.callbacks:
-                try:
-                    callback(metrics)
-                except Exception as e:
-                    logger.error(f"回调函数执行失败: {e}")
+            callbacks = tuple(self.callbacks)
+        for callback in callbacks:
+            try:
+                callback(metrics)
+            except Exception as e:
+                logger.error(f"回调函数执行失败: {e}")
 
     def get_device_metrics(self, udid: str) -> Optional[DeviceMetrics]:
         """获取设备指标"""
@@ -196,8 +283,13 @@ class AlertManager:
     """告警管理器"""
 
     def __init__(self):
-        self.alerts: Dict[str, Dict[str, Any]] = {}
-        self.alert_callbacks: List[Callable[[str, str, Dict[str, Any]], None]] = []
+        self.alerts: Dict[str, AlertRule] = {}
+        self.alert_callbacks: List[Callable[[str, str, AlertEvent], None]] = []
+        # 预编译的规则列表，与触发状态按位置对应
+        self._rules: Tuple[AlertRule, ...] = ()
+        self._triggered = bytearray()
+        # 每台设备上次检查时的指标值，未变化时跳过规则检查
+        self._last_values: Dict[str, tuple] = {}
 
     def add_alert_rule(
         self,
@@ -215,48 +307,63 @@ class AlertManager:
             message: 告警消息
             severity: 告警严重程度
         """
-        self.alerts[name] = {
-            "condition": condition,
-            "message": message,
-            "severity": severity,
-            "triggered": False,
-        }
-
-    def add_alert_callback(self, callback: Callable[[str, str, Dict[str, Any]], None]):
+        self.alerts[name] = AlertRule(name, condition, message, severity)
+        self._compile_rules()
+
+    def _compile_rules(self):
+        """根据self.alerts重建规则列表，保留已有规则的触发状态"""
+        previous = {rule.name: flag for rule, flag in zip(self._rules, self._triggered)}
+        self._rules = tuple(self.alerts.values())
+        self._triggered = bytearray(previous.get(rule.name, 0) for rule in self._rules)
+        self._last_values.clear()
+
+    def add_alert_callback(self, callback: Callable[[str, str, AlertEvent], None]):
         """添加告警回调函数"""
         self.alert_callbacks.append(callback)
 
     def check_alerts(self, metrics: DeviceMetrics):
         """检查告警条件"""
-        for name, alert in self.alerts.items():
+        # 指标与上次检查相同时规则结果不会变化，直接跳过
+        values = (
+            metrics.status,
+            metrics.battery_level,
+            metrics.memory_usage,
+            metrics.cpu_usage,
+            metrics.network_status,
+            metrics.temperature,
+            metrics.storage_free,
+            metrics.storage_total,
+        )
+        if self._last_values.get(metrics.udid) == values:
+            return
+        self._last_values[metrics.udid] = values
+
+        # 取规则与状态的快照，检查期间新增规则不会导致错位
+        rules, triggered = self._rules, self._triggered
+        for index, rule in enumerate(rules):
             try:
-                if alert["condition"](metrics):
-                    if not alert["triggered"]:
-                        self._trigger_alert(name, alert, metrics)
-                        alert["triggered"] = True
+                if rule.condition(metrics):
+                    if not triggered[index]:
+                        self._trigger_alert(rule, metrics)
+                        triggered[index] = 1
                 else:
-                    alert["triggered"] = False
+                    triggered[index] = 0
             except Exception as e:
-                logger.error(f"检查告警 {name} 时出错: {e}")
+                logger.error(f"检查告警 {rule.name} 时出错: {e}")
 
-    def _trigger_alert(self, name: str, alert: Dict[str, Any], metrics: DeviceMetrics):
+    def _trigger_alert(self, rule: AlertRule, metrics: DeviceMetrics):
         """触发告警"""
-        alert_data = {
-            "name": name,
-            "message": alert["message"],
-            "severity": alert["severity"],
-            "device_udid": metrics.udid,
-            "timestamp": metrics.timestamp,
-            "metrics": metrics,
-        }
+        event = AlertEvent(
+            rule.name, rule.message, rule.severity, metrics.udid, metrics.timestamp_dt, metrics
+        )
 
         for callback in self.alert_callbacks:
             try:
-                callback(name, alert["severity"], alert_data)
+                callback(rule.name, rule.severity, event)
             except Exception as e:
                 logger.error(f"告警回调执行失败: {e}")
 
-        logger.warning(f"告警触发: {name} - {alert['message']} (设备: {metrics.udid})")
+        logger.warning(f"告警触发: {rule.name} - {rule.message} (设备: {metrics.udid})")
 
 
 # 预定义的告警条件
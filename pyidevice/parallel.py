@@ -26,13 +26,20 @@ pyidevice 并发操作模块
 
 import concurrent.futures
 from typing import List, Dict, Any, Callable, Tuple, Optional, Union
+import functools
+import itertools
 import logging
+import os
+import sys
 import time
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 
 # 配置日志记录器
 logger = logging.getLogger(__name__)
 
+# 任务编号序列，用于生成进程内唯一的默认task_id
+_task_seq = itertools.count(1)
+
 
 class DeviceTask:
     """
@@ -47,6 +54,7 @@ class DeviceTask:
     - exception: 任务执行异常
     - start_time: 任务开始时间
     - end_time: 任务结束时间
+    - future: 任务提交后对应的Future，提交前为None
 
     用途：
     - 跟踪任务执行状态
@@ -55,19 +63,119 @@ class DeviceTask:
     - 计算任务执行时间
     """
 
+    __slots__ = ("udid", "_task_id", "result", "exception", "start_time", "end_time", "future")
+
     def __init__(self, udid: str, task_id: str = None):
         self.udid = udid
-        self.task_id = task_id or f"task_{int(time.time() * 1000)}_{udid[:8]}"
+        self._task_id = task_id or None
         self.result = None
         self.exception = None
         self.start_time = None
         self.end_time = None
+        self.future: Optional[concurrent.futures.Future] = None
+
+    @property
+    def task_id(self) -> str:
+        """任务ID，未指定时在首次访问时生成"""
+        if self._task_id is None:
+            self._task_id = f"task_{next(_task_seq)}_{self.udid[:8]}"
+        return self._task_id
+
+    def __getstate__(self):
+        # 进程模式下任务会被pickle传给子进程，future只在父进程中有意义且不可pickle；
+        # task_id在pickle前确定，保证父子进程中的ID一致
+        self.task_id
+        return {
+            name: getattr(self, name)
+            for name in self.__slots__
+            if name != "future" and hasattr(self, name)
+        }
+
+    def __setstate__(self, state):
+        self.future = None
+        for name, value in state.items():
+            setattr(self, name, value)
 
     def __str__(self):
         status = "completed" if self.end_time else "running" if self.start_time else "pending"
         return f"Task {self.task_id} (device: {self.udid}) - {status}"
 
 
+def _process_worker_init():
+    """进程池工作进程初始化：预先导入设备模块，首个任务无需承担导入开销"""
+    from . import device  # noqa: F401
+
+
+def _process_pool_kwargs() -> Dict[str, Any]:
+    """
+    进程池参数
+
+    优先使用forkserver启动方式：子进程由干净的服务进程fork而来，既避免了
+    在多线程父进程中直接fork的隐患，也不像spawn那样每个子进程重新导入全部模块。
+    """
+    if sys.version_info < (3, 7):
+        return {}
+    import multiprocessing
+
+    kwargs = {"initializer": _process_worker_init}
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        kwargs["mp_context"] = multiprocessing.get_context("forkserver")
+    return kwargs
+
+
+def _run_task(task: DeviceTask, func: Callable, args: tuple, kwargs: dict) -> Any:
+    """在执行器中运行设备任务并记录状态（模块级函数，提交任务时无需创建闭包）"""
+    task.start_time = time.perf_counter()
+    try:
+        task.result = func(task.udid, *args, **kwargs)
+        return task.result
+    except Exception as e:
+        task.exception = e
+        logger.error(f"Task {task.task_id} failed: {e}")
+        raise
+    finally:
+        task.end_time = time.perf_counter()
+
+
+def _run_task_chunk(tasks: List[DeviceTask], func: Callable, args: tuple, kwargs: dict) -> List[Tuple[bool, Any]]:
+    """在工作进程中依次执行一批任务，返回每个任务的 (是否成功, 结果或异常)"""
+    outcomes = []
+    for task in tasks:
+        try:
+            outcomes.append((True, _run_task(task, func, args, kwargs)))
+        except Exception as e:
+            outcomes.append((False, e))
+    return outcomes
+
+
+def _resolve_chunk(
+    tasks: List[DeviceTask], futures: List[concurrent.futures.Future], chunk_future: concurrent.futures.Future
+):
+    """批次完成后把结果分发到各任务自己的future上"""
+    end_time = time.perf_counter()
+    if chunk_future.cancelled():
+        # 批次被取消（如执行器关闭）时各任务的future也要结束，避免等待方一直阻塞到超时；
+        # 这些future已处于运行状态无法cancel()，改为设置CancelledError
+        for task, future in zip(tasks, futures):
+            task.end_time = end_time
+            task.exception = concurrent.futures.CancelledError()
+            future.set_exception(task.exception)
+        return
+    error = chunk_future.exception()
+    if error is not None:
+        outcomes = [(False, error)] * len(tasks)
+    else:
+        outcomes = chunk_future.result()
+    for task, future, (ok, value) in zip(tasks, futures, outcomes):
+        task.end_time = end_time
+        if ok:
+            task.result = value
+            future.set_result(value)
+        else:
+            task.exception = value
+            future.set_exception(value)
+
+
 class ParallelDeviceExecutor:
     """多设备并行执行器"""
 
@@ -87,54 +195,69 @@ class ParallelDeviceExecutor:
         if self.executor_type not in ["thread", "process"]:
             raise ValueError("executor_type must be 'thread' or 'process'")
 
-    def _create_executor(self):
+    def _default_max_workers(self, task_count: int) -> int:
+        """
+        未指定max_workers时的默认并发数
+
+        线程模式下任务主要在等待设备I/O，按任务数扩展（4~128）；
+        进程模式按当前进程可用的CPU核数（遵循容器/cgroup的CPU亲和性限制）。
+        """
+        if self.executor_type == "thread":
+            return min(128, max(4, task_count or 8))
+        try:
+            return len(os.sched_getaffinity(0))
+        except AttributeError:
+            return os.cpu_count() or 1
+
+    def _create_executor(self, task_count: int = 0):
         """创建执行器实例"""
+        max_workers = self.max_workers or self._default_max_workers(task_count)
+        logger.debug(f"Creating {self.executor_type} executor with max_workers={max_workers}")
         if self.executor_type == "thread":
-            return ThreadPoolExecutor(max_workers=self.max_workers)
+            return ThreadPoolExecutor(max_workers=max_workers)
         else:
-            return ProcessPoolExecutor(max_workers=self.max_workers)
+            # 进程池相关模块只在进程模式下导入，线程模式不必加载multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            return ProcessPoolExecutor(max_workers=max_workers, **_process_pool_kwargs())
 
     def submit_task(self, udid: str, func: Callable, *args, **kwargs) -> DeviceTask:
         """提交单个任务到指定设备"""
         task = DeviceTask(udid)
-
-        def task_wrapper():
-            task.start_time = time.time()
-            try:
-                result = func(udid, *args, **kwargs)
-                task.result = result
-                return result
-            except Exception as e:
-                task.exception = e
-                logger.error(f"Task {task.task_id} failed: {e}")
-                raise
-            finally:
-                task.end_time = time.time()
-
         self.tasks.append(task)
 
-        # 如果执行器还未创建，先返回任务，等待执行时创建
-        if not self.executor:
-            return task
+        executor = self.executor
+        if executor is None:
+            executor = self.executor = self._create_executor()
 
-        # 提交任务到执行器
-        future = self.executor.submit(task_wrapper)
-        task.future = future
+        task.future = executor.submit(_run_task, task, func, args, kwargs)
         return task
 
     def map_tasks(self, udids: List[str], func: Callable, *args, **kwargs) -> List[DeviceTask]:
         """为多个设备映射相同的任务"""
-        tasks = []
-
-        # 创建执行器
-        if not self.executor:
-            self.executor = self._create_executor()
-
-        # 为每个设备提交任务
-        for udid in udids:
-            task = self.submit_task(udid, func, *args, **kwargs)
-            tasks.append(task)
+        # 设备数已知，按设备数创建执行器
+        if self.executor is None:
+            self.executor = self._create_executor(len(udids))
 
+        if self.executor_type == "thread":
+            # 为每个设备提交任务
+            return [self.submit_task(udid, func, *args, **kwargs) for udid in udids]
+
+        # 进程模式按批提交，一次进程间通信传递多个任务
+        tasks = [DeviceTask(udid) for udid in udids]
+        self.tasks.extend(tasks)
+        workers = self.max_workers or self._default_max_workers(len(tasks))
+        chunksize = max(1, len(tasks) // (workers * 4))
+        for start in range(0, len(tasks), chunksize):
+            chunk = tasks[start:start + chunksize]
+            futures = []
+            for task in chunk:
+                future = concurrent.futures.Future()
+                future.set_running_or_notify_cancel()
+                task.future = future
+                futures.append(future)
+            chunk_future = self.executor.submit(_run_task_chunk, chunk, func, args, kwargs)
+            chunk_future.add_done_callback(functools.partial(_resolve_chunk, chunk, futures))
         return tasks
 
     def wait_for_completion(
@@ -144,18 +267,8 @@ class ParallelDeviceExecutor:
         if tasks is None:
             tasks = self.tasks
 
-        # 确保所有任务都已提交到执行器
-        if not self.executor:
-            self.executor = self._create_executor()
-            for task in tasks:
-                if not hasattr(task, "future"):
-                    # 重新提交任务
-                    self.submit_task(
-                        task.udid, lambda: None
-                    )  # 这只是示例，实际应该重新提交原始函数
-
         # 等待所有任务完成
-        futures = [task.future for task in tasks if hasattr(task, "future")]
+        futures = [task.future for task in tasks if task.future is not None]
         if futures:
             concurrent.futures.wait(futures, timeout=timeout)
 
@@ -168,7 +281,7 @@ class ParallelDeviceExecutor:
 
         results = {}
         for task in tasks:
-            if hasattr(task, "future"):
+            if task.future is not None:
                 try:
                     results[task.udid] = task.future.result()
                 except Exception as e:
@@ -204,19 +317,95 @@ def parallel_run(
     **kwargs,
 ) -> Dict[str, Any]:
     """并行在多个设备上执行任务的便捷函数"""
-    with ParallelDeviceExecutor(max_workers=max_workers, executor_type=executor_type) as executor:
+    executor = ParallelDeviceExecutor(max_workers=max_workers, executor_type=executor_type)
+    timed_out = False
+    try:
         # 映射任务到设备
-        tasks = executor.map_tasks(udids, func, *args, **kwargs)
+        futures = {task.future: task.udid for task in executor.map_tasks(udids, func, *args, **kwargs)}
+
+        # 按完成顺序收集结果，慢设备不会阻塞已完成设备的结果处理
+        results = {}
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    results[futures[future]] = {"error": str(e)}
+        except concurrent.futures.TimeoutError:
+            timed_out = True
+            for future, udid in futures.items():
+                if udid in results:
+                    continue
+                # as_completed最后一次产出后、抛出超时前完成的任务也要收集结果
+                if future.done():
+                    try:
+                        results[udid] = future.result()
+                    except Exception as e:
+                        results[udid] = {"error": str(e)}
+                else:
+                    future.cancel()
+                    results[udid] = {"error": f"任务超时（{timeout}秒）"}
+        # 按传入的设备顺序返回
+        return {udid: results[udid] for udid in futures.values()}
+    finally:
+        # 超时时不等待仍在运行的任务
+        executor.shutdown(wait=not timed_out)
+
+
+# 批量操作的任务函数定义在模块级别，可被pickle，因而也能用于executor_type="process"
+def _install_task(udid: str, ipa_path: str) -> bool:
+    from .device import Device
+
+    return Device(udid).install_app(ipa_path)
 
-        # 等待任务完成
-        executor.wait_for_completion(tasks, timeout=timeout)
 
-        # 返回结果
-        return executor.get_results(tasks)
+def _uninstall_task(udid: str, bundle_id: str) -> bool:
+    from .device import Device
+
+    return Device(udid).uninstall_app(bundle_id)
+
+
+def _get_info_task(udid: str) -> Dict:
+    from .device import Device
+
+    return Device(udid).info()
+
+
+def _drop_page_cache(path: str):
+    """
+    将已写入的文件刷盘并从页缓存中移除（仅支持posix_fadvise的平台）
+
+    大批量并行截图时避免截图文件挤占页缓存。脏页无法被丢弃，因此先fdatasync。
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fdatasync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError as e:
+        logger.debug(f"Failed to drop page cache for {path}: {e}")
+    finally:
+        os.close(fd)
+
+
+def _screenshot_task(udid: str, output_dir: str, drop_cache: bool = False) -> Optional[str]:
+    from .device import Device
+
+    output_path = os.path.join(output_dir, f"screenshot_{udid[:8]}.png")
+    success = Device(udid).take_screenshot(output_path)
+    if success and drop_cache:
+        _drop_page_cache(output_path)
+    return output_path if success else None
 
 
 class ConcurrentDeviceManager:
-    """并发设备管理器，提供更高级的并发操作接口"""
+    """
+    并发设备管理器，提供更高级的并发操作接口
+
+    批量操作（batch_install/batch_uninstall/batch_get_info/batch_screenshot）的任务函数
+    均可pickle，支持executor_type="process"。
+    """
 
     def __init__(self, device_manager=None):
         """
@@ -301,52 +490,31 @@ class ConcurrentDeviceManager:
         self, udids: List[str], ipa_path: str, max_workers: int = None, timeout: float = None
     ) -> Dict[str, bool]:
         """批量安装应用到多个设备"""
-
-        def install_task(udid):
-            from .device import Device
-
-            device = Device(udid)
-            return device.install_app(ipa_path)
-
         return self.execute_on_devices(
-            udids, install_task, max_workers=max_workers, timeout=timeout
+            udids, _install_task, ipa_path, max_workers=max_workers, timeout=timeout
         )
 
     def batch_uninstall(
         self, udids: List[str], bundle_id: str, max_workers: int = None, timeout: float = None
     ) -> Dict[str, bool]:
         """批量卸载多个设备上的应用"""
-
-        def uninstall_task(udid):
-            from .device import Device
-
-            device = Device(udid)
-            return device.uninstall_app(bundle_id)
-
         return self.execute_on_devices(
-            udids, uninstall_task, max_workers=max_workers, timeout=timeout
+            udids, _uninstall_task, bundle_id, max_workers=max_workers, timeout=timeout
         )
 
     def batch_get_info(
         self, udids: List[str] = None, max_workers: int = None, timeout: float = None
     ) -> Dict[str, Dict]:
         """批量获取设备信息"""
-
-        def get_info_task(udid):
-            from .device import Device
-
-            device = Device(udid)
-            return device.info()
-
         if udids is None:
             # 获取所有设备的信息
             return self.execute_on_all_devices(
-                get_info_task, max_workers=max_workers, timeout=timeout
+                _get_info_task, max_workers=max_workers, timeout=timeout
             )
         else:
             # 获取指定设备的信息
             return self.execute_on_devices(
-                udids, get_info_task, max_workers=max_workers, timeout=timeout
+                udids, _get_info_task, max_workers=max_workers, timeout=timeout
             )
 
     def batch_screenshot(
@@ -355,20 +523,16 @@ class ConcurrentDeviceManager:
         output_dir: str = ".",
         max_workers: int = None,
         timeout: float = None,
+        drop_cache: bool = False,
     ) -> Dict[str, str]:
-        """批量截取设备屏幕截图"""
-        import os
+        """
+        批量截取设备屏幕截图
 
+        Args:
+            drop_cache: 截图写入后刷盘并释放其占用的页缓存（Linux），适合大批量截图
+        """
         os.makedirs(output_dir, exist_ok=True)
 
-        def screenshot_task(udid):
-            from .device import Device
-
-            device = Device(udid)
-            output_path = os.path.join(output_dir, f"screenshot_{udid[:8]}.png")
-            success = device.take_screenshot(output_path)
-            return output_path if success else None
-
         return self.execute_on_devices(
-            udids, screenshot_task, max_workers=max_workers, timeout=timeout
+            udids, _screenshot_task, output_dir, drop_cache, max_workers=max_workers, timeout=timeout
         )
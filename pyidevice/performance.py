@@ -3,13 +3,81 @@
 import time
 import psutil
 import logging
+import threading
+from collections import deque
+from itertools import islice
 from typing import Dict, List, Optional, Callable, Any
-from functools import wraps
+from functools import partial, update_wrapper, wraps
+from types import MethodType
 from contextlib import contextmanager
 from .types import DeviceOperationResult
 
 logger = logging.getLogger(__name__)
 
+_clock = time.perf_counter
+
+
+# 各类样本保留的最近条数，统计值由累计量计算，不受保留条数影响
+_MAX_SAMPLES = 10000
+_MAX_DEVICE_OPERATIONS = 1000
+
+
+class _RunningStats:
+    """增量维护的计数、总和与最大值，统计时无需遍历样本"""
+
+    __slots__ = ("count", "total", "maximum")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+
+class _SystemSampler:
+    """
+    系统CPU/内存后台采样器
+
+    由一个守护线程按固定间隔采样，最新结果以元组整体赋值给last，
+    读取方直接读取属性即可，无需加锁，也不会在调用线程上执行psutil调用。
+    """
+
+    _instance: Optional["_SystemSampler"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        # 首次采样同步完成，保证last始终有值（cpu_percent首次调用同时完成基准采样）
+        self.last = (psutil.cpu_percent(interval=None), psutil.virtual_memory().percent)
+        self._thread = threading.Thread(target=self._run, name="SystemSampler", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def get(cls) -> "_SystemSampler":
+        """获取全局采样器，首次调用时启动"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.last = (psutil.cpu_percent(interval=None), psutil.virtual_memory().percent)
+            except Exception as e:
+                logger.debug(f"系统指标采样失败: {e}")
+
 
 class PerformanceMonitor:
     """性能监控器"""
@@ -17,17 +85,24 @@ class PerformanceMonitor:
     def __init__(self):
         self.metrics = {}
         self.start_time = None
-        self.operation_times = []
+        self.operation_times = deque(maxlen=_MAX_SAMPLES)
+        self._op_stats = _RunningStats()
+        self._cpu_stats = _RunningStats()
+        self._memory_stats = _RunningStats()
 
     def start_monitoring(self):
         """开始监控"""
         self.start_time = time.time()
         self.metrics = {
-            "cpu_percent": [],
-            "memory_percent": [],
+            "cpu_percent": deque(maxlen=_MAX_SAMPLES),
+            "memory_percent": deque(maxlen=_MAX_SAMPLES),
             "operation_count": 0,
             "total_operations": 0,
         }
+        self.operation_times = deque(maxlen=_MAX_SAMPLES)
+        self._op_stats = _RunningStats()
+        self._cpu_stats = _RunningStats()
+        self._memory_stats = _RunningStats()
         logger.info("性能监控已启动")
 
     def stop_monitoring(self) -> Dict[str, Any]:
@@ -38,24 +113,12 @@ class PerformanceMonitor:
         duration = time.time() - self.start_time
         stats = {
             "duration": duration,
-            "avg_cpu": (
-                sum(self.metrics["cpu_percent"]) / len(self.metrics["cpu_percent"])
-                if self.metrics["cpu_percent"]
-                else 0
-            ),
-            "max_cpu": max(self.metrics["cpu_percent"]) if self.metrics["cpu_percent"] else 0,
-            "avg_memory": (
-                sum(self.metrics["memory_percent"]) / len(self.metrics["memory_percent"])
-                if self.metrics["memory_percent"]
-                else 0
-            ),
-            "max_memory": (
-                max(self.metrics["memory_percent"]) if self.metrics["memory_percent"] else 0
-            ),
+            "avg_cpu": self._cpu_stats.mean,
+            "max_cpu": self._cpu_stats.maximum,
+            "avg_memory": self._memory_stats.mean,
+            "max_memory": self._memory_stats.maximum,
             "operation_count": self.metrics["operation_count"],
-            "avg_operation_time": (
-                sum(self.operation_times) / len(self.operation_times) if self.operation_times else 0
-            ),
+            "avg_operation_time": self._op_stats.mean,
             "total_operations": self.metrics["total_operations"],
         }
 
@@ -65,27 +128,35 @@ class PerformanceMonitor:
     def record_operation(self, operation_time: float):
         """记录操作时间"""
         self.operation_times.append(operation_time)
+        self._op_stats.add(operation_time)
         self.metrics["operation_count"] += 1
         self.metrics["total_operations"] += 1
 
     def record_system_metrics(self):
         """记录系统指标"""
-        self.metrics["cpu_percent"].append(psutil.cpu_percent())
-        self.metrics["memory_percent"].append(psutil.virtual_memory().percent)
+        cpu, memory = _SystemSampler.get().last
+        self.metrics["cpu_percent"].append(cpu)
+        self.metrics["memory_percent"].append(memory)
+        self._cpu_stats.add(cpu)
+        self._memory_stats.add(memory)
 
 
 def monitor_performance(func: Callable) -> Callable:
     """性能监控装饰器"""
 
+    clock = time.perf_counter
+    name = func.__name__
+
     @wraps(func)
     def wrapper(*args, **kwargs) -> Any:
-        start_time = time.time()
+        # 未开启DEBUG日志时计时结果无处输出，直接调用
+        if not logger.isEnabledFor(logging.DEBUG):
+            return func(*args, **kwargs)
+        start_time = clock()
         try:
-            result = func(*args, **kwargs)
-            return result
+            return func(*args, **kwargs)
         finally:
-            operation_time = time.time() - start_time
-            logger.debug(f"{func.__name__} 执行时间: {operation_time:.3f}秒")
+            logger.debug("%s 执行时间: %.3f秒", name, clock() - start_time)
 
     return wrapper
 
@@ -102,85 +173,128 @@ def performance_context(operation_name: str):
         logger.info(f"{operation_name} 完成，耗时: {duration:.3f}秒")
 
 
+# DevicePerformanceTracker的分片数（2的幂），不同设备的记录分散到各自加锁的分片
+_TRACKER_SHARDS = 16
+
+
 class DevicePerformanceTracker:
     """设备性能跟踪器"""
 
     def __init__(self):
-        self.device_metrics = {}
+        # 按UDID哈希分片，各分片独立加锁，不同设备的并行操作互不争用
+        self._shards: List[Dict[str, Dict[str, Any]]] = [{} for _ in range(_TRACKER_SHARDS)]
+        self._locks = [threading.Lock() for _ in range(_TRACKER_SHARDS)]
+
+    @property
+    def device_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """所有设备的原始记录（各分片合并后的快照）"""
+        merged = {}
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                merged.update(shard)
+        return merged
 
     def track_device_operation(self, udid: str, operation: str, duration: float, success: bool):
         """跟踪设备操作"""
-        if udid not in self.device_metrics:
-            self.device_metrics[udid] = {
-                "operations": [],
-                "total_time": 0,
-                "success_count": 0,
-                "failure_count": 0,
-            }
-
-        metrics = self.device_metrics[udid]
-        metrics["operations"].append(
-            {
-                "operation": operation,
-                "duration": duration,
-                "success": success,
-                "timestamp": time.time(),
-            }
-        )
-
-        metrics["total_time"] += duration
-        if success:
-            metrics["success_count"] += 1
-        else:
-            metrics["failure_count"] += 1
+        bucket = hash(udid) & (_TRACKER_SHARDS - 1)
+        shard = self._shards[bucket]
+        with self._locks[bucket]:
+            metrics = shard.get(udid)
+            if metrics is None:
+                metrics = shard[udid] = {
+                    "operations": deque(maxlen=_MAX_DEVICE_OPERATIONS),
+                    "total_time": 0,
+                    "success_count": 0,
+                    "failure_count": 0,
+                }
+
+            metrics["operations"].append(
+                {
+                    "operation": operation,
+                    "duration": duration,
+                    "success": success,
+                    "timestamp": time.time(),
+                }
+            )
+
+            metrics["total_time"] += duration
+            if success:
+                metrics["success_count"] += 1
+            else:
+                metrics["failure_count"] += 1
 
     def get_device_stats(self, udid: str) -> Dict[str, Any]:
         """获取设备统计信息"""
-        if udid not in self.device_metrics:
-            return {}
-
-        metrics = self.device_metrics[udid]
-        total_ops = metrics["success_count"] + metrics["failure_count"]
-
-        return {
-            "total_operations": total_ops,
-            "success_rate": metrics["success_count"] / total_ops if total_ops > 0 else 0,
-            "avg_operation_time": metrics["total_time"] / total_ops if total_ops > 0 else 0,
-            "total_time": metrics["total_time"],
-            "recent_operations": metrics["operations"][-10:],  # 最近10次操作
-        }
+        bucket = hash(udid) & (_TRACKER_SHARDS - 1)
+        with self._locks[bucket]:
+            metrics = self._shards[bucket].get(udid)
+            if metrics is None:
+                return {}
+
+            total_ops = metrics["success_count"] + metrics["failure_count"]
+
+            return {
+                "total_operations": total_ops,
+                "success_rate": metrics["success_count"] / total_ops if total_ops > 0 else 0,
+                "avg_operation_time": metrics["total_time"] / total_ops if total_ops > 0 else 0,
+                "total_time": metrics["total_time"],
+                "recent_operations": list(islice(reversed(metrics["operations"]), 10))[::-1],  # 最近10次操作
+            }
 
     def get_all_stats(self) -> Dict[str, Dict[str, Any]]:
         """获取所有设备统计信息"""
-        return {udid: self.get_device_stats(udid) for udid in self.device_metrics}
+        stats = {}
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                udids = list(shard)
+            for udid in udids:
+                stats[udid] = self.get_device_stats(udid)
+        return stats
 
 
-# 全局性能跟踪器实例
-performance_tracker = DevicePerformanceTracker()
+# 全局性能跟踪器实例，置为None可关闭设备操作跟踪
+performance_tracker: Optional[DevicePerformanceTracker] = DevicePerformanceTracker()
 
 
-def track_device_operation(udid: str, operation: str):
-    """设备操作跟踪装饰器"""
+class _TrackedOperation:
+    """
+    被track_device_operation包装的设备操作
 
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs) -> Any:
-            start_time = time.time()
-            success = False
-            try:
-                result = func(*args, **kwargs)
-                success = True
-                return result
-            except Exception as e:
-                logger.error(f"设备操作失败 {operation}: {e}")
-                raise
-            finally:
-                duration = time.time() - start_time
-                performance_tracker.track_device_operation(udid, operation, duration, success)
+    以可调用对象代替多层闭包，调用路径更短，且可通过udid/operation属性查看跟踪信息。
+    """
 
-        return wrapper
+    def __init__(self, func: Callable, udid: str, operation: str):
+        update_wrapper(self, func)
+        self.func = func
+        self.udid = udid
+        self.operation = operation
 
-    return decorator
+    def __call__(self, *args, **kwargs) -> Any:
+        tracker = performance_tracker
+        if tracker is None:
+            return self.func(*args, **kwargs)
+        start_time = _clock()
+        success = False
+        try:
+            result = self.func(*args, **kwargs)
+            success = True
+            return result
+        except Exception as e:
+            logger.error(f"设备操作失败 {self.operation}: {e}")
+            raise
+        finally:
+            tracker.track_device_operation(self.udid, self.operation, _clock() - start_time, success)
+
+    def __get__(self, instance, owner=None):
+        # 作为方法装饰器使用时绑定实例
+        if instance is None:
+            return self
+        return MethodType(self, instance)
+
+
+def track_device_operation(udid: str, operation: str):
+    """设备操作跟踪装饰器"""
+    return partial(_TrackedOperation, udid=udid, operation=operation)
 
 
 class ResourceMonitor:
@@ -189,7 +303,9 @@ class ResourceMonitor:
     def __init__(self):
         self.process = psutil.Process()
         self.start_memory = self.process.memory_info().rss
+        # 首次调用建立基准，之后get_cpu_usage返回的是两次调用之间的使用率
         self.start_cpu = self.process.cpu_percent()
+        self._cpu_lock = threading.Lock()
 
     def get_memory_usage(self) -> Dict[str, float]:
         """获取内存使用情况"""
@@ -202,16 +318,25 @@ class ResourceMonitor:
 
     def get_cpu_usage(self) -> float:
         """获取CPU使用率"""
-        return self.process.cpu_percent()
-
-    def get_resource_summary(self) -> Dict[str, Any]:
-        """获取资源使用摘要"""
-        return {
+        # cpu_percent依赖上一次调用的基准，多线程同时调用时需串行
+        with self._cpu_lock:
+            return self.process.cpu_percent()
+
+    def get_resource_summary(self, detailed: bool = False) -> Dict[str, Any]:
+        """
+        获取资源使用摘要
+
+        Args:
+            detailed: 是否包含打开文件数（需要遍历进程的全部文件描述符，开销较大）
+        """
+        summary = {
             "memory": self.get_memory_usage(),
             "cpu_percent": self.get_cpu_usage(),
             "threads": self.process.num_threads(),
-            "open_files": len(self.process.open_files()),
         }
+        if detailed:
+            summary["open_files"] = len(self.process.open_files())
+        return summary
 
 
 def optimize_memory_usage():
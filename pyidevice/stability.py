@@ -51,20 +51,60 @@ pyidevice 稳定性增强模块
 """
 
 import asyncio
+import heapq
+import itertools
 import threading
 import time
 import logging
-from typing import Any, Callable, Dict, List, Optional, Union, Tuple, Type
-from functools import wraps
+import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union, Tuple, Type
+from functools import wraps, lru_cache
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from enum import Enum
 import weakref
 import gc
+from collections import defaultdict, deque
+import random
+from .types import add_slots
+from .utils import _UDID_PATTERN, _UDID_RE
 
 # 配置日志记录器
 logger = logging.getLogger(__name__)
 
+# 计算时间间隔统一使用单调时钟，不受系统时间调整影响
+_monotonic = time.monotonic
+
+# 标记当前线程是否为超时执行线程
+_timeout_local = threading.local()
+
+
+def _timeout_worker(func: Callable, args: tuple, kwargs: dict) -> Any:
+    """在超时执行线程中运行函数"""
+    _timeout_local.active = True
+    return func(*args, **kwargs)
+
+
+def _call_with_timeout(
+    executor: ThreadPoolExecutor, timeout: float, name: str, func: Callable, *args, **kwargs
+) -> Any:
+    """
+    在执行器线程中运行函数并等待结果，超时抛出TimeoutError
+
+    不依赖SIGALRM，任意线程中均可使用，且支持小数秒超时。超时后工作线程中的函数
+    无法被中断，会在后台运行至结束。已在超时执行线程中时直接调用，
+    避免嵌套超时占满执行器导致死锁（外层超时仍然生效）。
+    """
+    if getattr(_timeout_local, "active", False):
+        return func(*args, **kwargs)
+    future = executor.submit(_timeout_worker, func, args, kwargs)
+    try:
+        return future.result(timeout=timeout)
+    except FuturesTimeoutError:
+        future.cancel()
+        raise TimeoutError(f"操作超时: {name} ({timeout}s)") from None
+
 
 class RetryStrategy(Enum):
     """重试策略枚举"""
@@ -72,6 +112,7 @@ class RetryStrategy(Enum):
     EXPONENTIAL = "exponential"  # 指数退避重试
     LINEAR = "linear"  # 线性增长重试
     CUSTOM = "custom"  # 自定义重试
+    DECORRELATED_JITTER = "decorrelated_jitter"  # 去相关抖动：在[基础延迟, 上次延迟*3]内随机
 
 
 @dataclass
@@ -82,10 +123,49 @@ class RetryConfig:
     max_delay: float = 60.0
     backoff_factor: float = 2.0
     strategy: RetryStrategy = RetryStrategy.EXPONENTIAL
-    jitter: bool = True  # 是否添加随机抖动
+    jitter: bool = True  # 是否使用全抖动（在[0, 退避延迟]内随机取值）
     exceptions: Tuple[Type[Exception], ...] = (Exception,)
 
 
+def _except_target(exceptions: Union[Type[BaseException], Tuple[Type[BaseException], ...]]):
+    """
+    规范化except子句匹配的异常类型
+
+    只有一个异常类时直接返回该类，except匹配单个类比遍历元组更快；否则返回元组。
+    """
+    if isinstance(exceptions, tuple):
+        return exceptions[0] if len(exceptions) == 1 else exceptions
+    return exceptions
+
+
+# 不超过该重试次数时，RetryManager生成展开的重试函数代替通用循环
+_MAX_UNROLLED_RETRIES = 5
+
+
+class _RetryStats:
+    """单个函数的重试统计"""
+
+    __slots__ = ("success", "failure", "retries")
+
+    def __init__(self):
+        self.success = 0
+        self.failure = 0
+        self.retries = 0
+
+
+class _ShardToken:
+    """存放在线程本地存储中的分片标记，线程结束时随之回收，用于触发分片合并"""
+
+    __slots__ = ("__weakref__",)
+
+
+def _retire_stats_shard(manager_ref: "weakref.ReferenceType", key: int):
+    """线程结束后把其统计分片合并进管理器的累计统计"""
+    manager = manager_ref()
+    if manager is not None:
+        manager._retire_shard(key)
+
+
 class RetryManager:
     """
     智能重试管理器
@@ -95,19 +175,59 @@ class RetryManager:
     - 固定间隔重试
     - 线性增长重试
     - 自定义重试策略
-    - 随机抖动避免雷群效应
+    - 全抖动/去相关抖动避免雷群效应
     - 异常类型过滤
     """
     
-    def __init__(self, config: Optional[RetryConfig] = None):
+    def __init__(self, config: Optional[RetryConfig] = None, seed: Optional[int] = None):
         """
         初始化重试管理器
         
         Args:
             config: 重试配置，如果为None则使用默认配置
+            seed: 抖动随机数种子，指定后延迟序列可复现（便于测试），None表示随机
         """
         self.config = config or RetryConfig()
-        self._retry_stats = {}  # 重试统计信息
+        # 每个管理器独立的随机数生成器，不与全局random共享状态
+        self._uniform = random.Random(seed).uniform
+        # 重试统计按线程分片：每个线程只更新自己的分片，热路径无需加锁且不会丢失计数，
+        # get_stats时再汇总所有分片；线程结束后其分片合并进_retired_stats，分片数不随线程更替增长
+        self._stats_local = threading.local()
+        self._stats_shards: Dict[int, Dict[str, _RetryStats]] = {}
+        self._shard_ids = itertools.count()
+        self._retired_stats: Dict[str, _RetryStats] = defaultdict(_RetryStats)
+        self._stats_lock = threading.Lock()  # 仅在注册、合并分片和汇总时使用
+        self._last_delay = self.config.base_delay  # 去相关抖动策略的上次延迟
+        self._specialize(self.config.max_retries, self.config.exceptions)
+    
+    def _thread_stats(self) -> Dict[str, _RetryStats]:
+        """当前线程的统计分片，首次调用时创建并注册"""
+        try:
+            return self._stats_local.stats
+        except AttributeError:
+            shard = defaultdict(_RetryStats)
+            token = _ShardToken()
+            key = next(self._shard_ids)
+            with self._stats_lock:
+                self._stats_shards[key] = shard
+            # 线程结束时线程本地存储被清理，标记随之回收，触发分片合并
+            weakref.finalize(token, _retire_stats_shard, weakref.ref(self), key)
+            self._stats_local.token = token
+            self._stats_local.stats = shard
+            return shard
+    
+    def _retire_shard(self, key: int):
+        """移除已结束线程的统计分片，计数合并进累计统计"""
+        with self._stats_lock:
+            shard = self._stats_shards.pop(key, None)
+            if not shard:
+                return
+            retired = self._retired_stats
+            for name, stats in shard.items():
+                total = retired[name]
+                total.success += stats.success
+                total.failure += stats.failure
+                total.retries += stats.retries
         
     def execute(self, func: Callable, *args, **kwargs) -> Any:
         """
@@ -124,44 +244,231 @@ class RetryManager:
         Raises:
             最后一次重试的异常
         """
+        return self._run(func, getattr(func, '__name__', str(func)), args, kwargs)
+    
+    def execute_until(self, deadline: float, func: Callable, *args, **kwargs) -> Any:
+        """
+        在截止时间内执行带重试的函数
+        
+        每次重试前估算"退避等待 + 上次调用耗时"，若会超过截止时间则不再重试，
+        直接抛出最近一次的异常，避免安排注定被外层超时取消的重试。
+        至少会执行一次。
+        
+        Args:
+            deadline: 截止时间（time.monotonic()时钟的绝对时间）
+            func: 要执行的函数
+            *args: 函数位置参数
+            **kwargs: 函数关键字参数
+            
+        Returns:
+            函数执行结果
+            
+        Raises:
+            最后一次尝试的异常
+        """
+        func_name = getattr(func, '__name__', str(func))
+        stats = self._thread_stats()[func_name]
+        max_retries = self.config.max_retries
+        exceptions = _except_target(self.config.exceptions)
+        
+        for attempt in range(max_retries + 1):
+            started = _monotonic()
+            try:
+                result = func(*args, **kwargs)
+            except exceptions as e:
+                stats.failure += 1
+                if attempt >= max_retries:
+                    logger.error("所有 %d 次尝试都失败了: %s", max_retries + 1, func_name)
+                    raise
+                
+                delay = self._calculate_delay(attempt)
+                now = _monotonic()
+                if now + delay + (now - started) > deadline:
+                    logger.warning(
+                        "尝试 %d/%d 失败: %s - %s. 剩余时间不足以再次尝试，放弃重试",
+                        attempt + 1, max_retries + 1, func_name, e
+                    )
+                    raise
+                
+                logger.warning(
+                    "尝试 %d/%d 失败: %s - %s. 将在 %.2fs 后重试...",
+                    attempt + 1, max_retries + 1, func_name, e, delay
+                )
+                time.sleep(delay)
+                stats.retries += 1
+            else:
+                stats.success += 1
+                return result
+    
+    def wrap(self, func: Callable) -> Callable:
+        """
+        返回带重试的包装函数
+        
+        函数名在包装时确定，重试循环直接绑定在闭包中，每次调用不再重复查找。
+        协程函数包装为使用aexecute的协程函数。
+        """
+        if asyncio.iscoroutinefunction(func):
+            aexecute = self.aexecute
+            
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await aexecute(func, *args, **kwargs)
+            return async_wrapper
+        
         func_name = getattr(func, '__name__', str(func))
+        run = self._run
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return run(func, func_name, args, kwargs)
+        return wrapper
+    
+    def _run(self, func: Callable, func_name: str, args: tuple, kwargs: dict) -> Any:
+        """重试循环"""
+        config = self.config
+        max_retries = config.max_retries
+        if max_retries != self._unrolled_retries or config.exceptions is not self._unrolled_exceptions:
+            # 配置已变更，重新生成专用函数
+            self._specialize(max_retries, config.exceptions)
+        unrolled = self._unrolled
+        if unrolled is not None:
+            return unrolled(func, func_name, args, kwargs)
+        
+        exceptions = self._except_target
+        stats = self._thread_stats()[func_name]
         last_exception = None
         
-        for attempt in range(self.config.max_retries + 1):
+        for attempt in range(max_retries + 1):
             try:
                 result = func(*args, **kwargs)
                 
                 # 记录成功统计
-                if func_name not in self._retry_stats:
-                    self._retry_stats[func_name] = {'success': 0, 'failure': 0, 'retries': 0}
-                self._retry_stats[func_name]['success'] += 1
+                stats.success += 1
                 
                 return result
                 
-            except self.config.exceptions as e:
+            except exceptions as e:
                 last_exception = e
                 
                 # 记录失败统计
-                if func_name not in self._retry_stats:
-                    self._retry_stats[func_name] = {'success': 0, 'failure': 0, 'retries': 0}
-                self._retry_stats[func_name]['failure'] += 1
+                stats.failure += 1
+                
+                if attempt < max_retries:
+                    self._backoff(attempt, max_retries, func_name, e, stats)
+                else:
+                    logger.error("所有 %d 次尝试都失败了: %s", max_retries + 1, func_name)
+                    break
+        
+        # 所有重试都失败了
+        raise last_exception
+    
+    def _backoff(self, attempt: int, max_retries: int, func_name: str, error: Exception, stats: _RetryStats):
+        """第attempt次尝试失败后等待重试"""
+        # 计算重试延迟
+        delay = self._calculate_delay(attempt)
+        
+        logger.warning(
+            "尝试 %d/%d 失败: %s - %s. 将在 %.2fs 后重试...",
+            attempt + 1, max_retries + 1, func_name, error, delay
+        )
+        
+        time.sleep(delay)
+        stats.retries += 1
+    
+    def _specialize(self, max_retries: int, exceptions: Tuple[Type[Exception], ...]):
+        """
+        为当前重试次数生成展开的重试函数
+        
+        重试次数不超过_MAX_UNROLLED_RETRIES时，把每次尝试直接展开为顺序代码，
+        省去循环与分支判断；重试次数更多时使用通用循环。
+        """
+        unrolled = None
+        if max_retries <= _MAX_UNROLLED_RETRIES:
+            lines = [
+                "def _unrolled_run(func, func_name, args, kwargs):",
+                "    stats = thread_stats()[func_name]",
+            ]
+            for attempt in range(max_retries + 1):
+                lines += [
+                    "    try:",
+                    "        result = func(*args, **kwargs)",
+                    "    except exceptions as e:",
+                    "        stats.failure += 1",
+                ]
+                if attempt < max_retries:
+                    lines.append(f"        backoff({attempt}, {max_retries}, func_name, e, stats)")
+                else:
+                    lines += [
+                        f"        logger.error('所有 %d 次尝试都失败了: %s', {max_retries + 1}, func_name)",
+                        "        raise",
+                    ]
+                lines += [
+                    "    else:",
+                    "        stats.success += 1",
+                    "        return result",
+                ]
+            namespace = {
+                "thread_stats": self._thread_stats,
+                "exceptions": _except_target(exceptions),
+                "backoff": self._backoff,
+                "logger": logger,
+            }
+            exec("\n".join(lines), namespace)
+            unrolled = namespace["_unrolled_run"]
+        
+        self._unrolled = unrolled
+        self._unrolled_retries = max_retries
+        self._unrolled_exceptions = exceptions
+        self._except_target = _except_target(exceptions)
+    
+    async def aexecute(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        执行带重试的协程函数
+        
+        与execute相同，但等待func返回的协程，并使用asyncio.sleep退避，不阻塞事件循环。
+        
+        Args:
+            func: 要执行的协程函数
+            *args: 函数位置参数
+            **kwargs: 函数关键字参数
+            
+        Returns:
+            函数执行结果
+            
+        Raises:
+            最后一次重试的异常
+        """
+        func_name = getattr(func, '__name__', str(func))
+        stats = self._thread_stats()[func_name]
+        config = self.config
+        max_retries = config.max_retries
+        exceptions = _except_target(config.exceptions)
+        last_exception = None
+        
+        for attempt in range(max_retries + 1):
+            try:
+                result = await func(*args, **kwargs)
+                stats.success += 1
+                return result
+                
+            except exceptions as e:
+                last_exception = e
+                stats.failure += 1
                 
-                if attempt < self.config.max_retries:
-                    # 计算重试延迟
+                if attempt < max_retries:
                     delay = self._calculate_delay(attempt)
                     
                     logger.warning(
-                        f"尝试 {attempt + 1}/{self.config.max_retries + 1} 失败: {func_name} - {e}. "
-                        f"将在 {delay:.2f}s 后重试..."
+                        "尝试 %d/%d 失败: %s - %s. 将在 %.2fs 后重试...",
+                        attempt + 1, max_retries + 1, func_name, e, delay
                     )
                     
-                    time.sleep(delay)
-                    self._retry_stats[func_name]['retries'] += 1
+                    await asyncio.sleep(delay)
+                    stats.retries += 1
                 else:
-                    logger.error(f"所有 {self.config.max_retries + 1} 次尝试都失败了: {func_name}")
+                    logger.error("所有 %d 次尝试都失败了: %s", max_retries + 1, func_name)
                     break
         
-        # 所有重试都失败了
         raise last_exception
     
     def _calculate_delay(self, attempt: int) -> float:
@@ -174,23 +481,31 @@ class RetryManager:
         Returns:
             延迟时间（秒）
         """
-        if self.config.strategy == RetryStrategy.FIXED:
-            delay = self.config.base_delay
-        elif self.config.strategy == RetryStrategy.EXPONENTIAL:
-            delay = self.config.base_delay * (self.config.backoff_factor ** attempt)
-        elif self.config.strategy == RetryStrategy.LINEAR:
-            delay = self.config.base_delay * (attempt + 1)
-        else:  # CUSTOM
-            delay = self.config.base_delay
+        config = self.config
+        strategy = config.strategy
+        base_delay = config.base_delay
+        if strategy is RetryStrategy.DECORRELATED_JITTER:
+            # 本身已是随机延迟，不再叠加抖动
+            last_delay = base_delay if attempt == 0 else self._last_delay
+            delay = self._uniform(base_delay, last_delay * 3)
+            if delay > config.max_delay:
+                delay = config.max_delay
+            self._last_delay = delay
+            return delay
+        if strategy is RetryStrategy.EXPONENTIAL:
+            delay = base_delay * (config.backoff_factor ** attempt)
+        elif strategy is RetryStrategy.LINEAR:
+            delay = base_delay * (attempt + 1)
+        else:  # FIXED / CUSTOM
+            delay = base_delay
         
         # 限制最大延迟
-        delay = min(delay, self.config.max_delay)
+        if delay > config.max_delay:
+            delay = config.max_delay
         
-        # 添加随机抖动
-        if self.config.jitter:
-            import random
-            jitter = random.uniform(0.1, 0.3) * delay
-            delay += jitter
+        # 全抖动：在[0, delay]内均匀取值，避免多个客户端同步重试
+        if config.jitter:
+            delay = self._uniform(0.0, delay)
         
         return delay
     
@@ -201,23 +516,103 @@ class RetryManager:
         Returns:
             重试统计信息字典
         """
-        return self._retry_stats.copy()
+        totals: Dict[str, Dict[str, int]] = {}
+        with self._stats_lock:
+            shards = [dict(self._retired_stats)]
+            shards.extend(self._stats_shards.values())
+        for shard in shards:
+            for name, stats in list(shard.items()):
+                total = totals.get(name)
+                if total is None:
+                    totals[name] = {
+                        'success': stats.success, 'failure': stats.failure, 'retries': stats.retries
+                    }
+                else:
+                    total['success'] += stats.success
+                    total['failure'] += stats.failure
+                    total['retries'] += stats.retries
+        return totals
     
     def reset_stats(self):
         """重置重试统计信息"""
-        self._retry_stats.clear()
+        with self._stats_lock:
+            for shard in self._stats_shards.values():
+                shard.clear()
+            self._retired_stats.clear()
 
 
+@add_slots
 @dataclass
 class ConnectionInfo:
-    """连接信息"""
-    id: str
+    """连接信息（时间字段为time.monotonic()时钟）"""
+    id: int
     created_at: float
     last_used: float
     is_active: bool = True
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+class _CleanupScheduler:
+    """
+    连接池清理调度器
+
+    所有连接池共用一个后台线程，按到期时间从堆中取出连接池执行清理后重新入堆。
+    只持有连接池的弱引用，未关闭就被丢弃的连接池可以被正常回收。
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Any, float]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition(threading.Lock())
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, pool: "ConnectionPool", interval: float):
+        """登记连接池，每隔interval秒清理一次"""
+        with self._cond:
+            heapq.heappush(self._heap, (_monotonic() + interval, next(self._seq), weakref.ref(pool), interval))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    daemon=True,
+                    name="ConnectionPool-Cleanup"
+                )
+                self._thread.start()
+            else:
+                # 新任务可能比当前等待的任务更早到期
+                self._cond.notify()
+
+    def _run(self):
+        """调度线程"""
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                due, _, pool_ref, interval = self._heap[0]
+                delay = due - _monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+            
+            pool = pool_ref()
+            if pool is None or pool._stop_cleanup.is_set():
+                continue
+            try:
+                pool._cleanup_expired_connections()
+            except Exception as e:
+                logger.error("连接池清理过程中发生错误: %s", e)
+            del pool
+            
+            with self._cond:
+                heapq.heappush(self._heap, (_monotonic() + interval, next(self._seq), pool_ref, interval))
+
+
+_cleanup_scheduler = _CleanupScheduler()
+
+# 进程内唯一的连接ID生成器
+_next_conn_id = itertools.count(1).__next__
+
+
 class ConnectionPool:
     """
     连接池管理器
@@ -251,48 +646,43 @@ class ConnectionPool:
         self.idle_timeout = idle_timeout
         self.cleanup_interval = cleanup_interval
         
-        self._connections: Dict[str, ConnectionInfo] = {}
-        self._lock = threading.RLock()
-        self._cleanup_thread = None
+        self._connections: Dict[int, ConnectionInfo] = {}
+        # 空闲连接ID栈（后进先出），deque的append/pop是原子操作，获取/释放连接无需加锁；
+        # 清理时过期连接的ID一并移出，并发情况下残留的ID在出栈时跳过
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
         self._stop_cleanup = threading.Event()
         
-        # 启动清理线程
-        self._start_cleanup_thread()
-    
-    def _start_cleanup_thread(self):
-        """启动清理线程"""
-        if self._cleanup_thread is None or not self._cleanup_thread.is_alive():
-            self._cleanup_thread = threading.Thread(
-                target=self._cleanup_worker,
-                daemon=True,
-                name="ConnectionPool-Cleanup"
-            )
-            self._cleanup_thread.start()
-    
-    def _cleanup_worker(self):
-        """清理工作线程"""
-        while not self._stop_cleanup.wait(self.cleanup_interval):
-            try:
-                self._cleanup_expired_connections()
-            except Exception as e:
-                logger.error(f"连接池清理过程中发生错误: {e}")
+        # 由全局清理调度器定期清理，不为每个连接池单独创建线程
+        _cleanup_scheduler.register(self, self.cleanup_interval)
     
     def _cleanup_expired_connections(self):
         """清理过期连接"""
-        current_time = time.time()
-        expired_connections = []
+        now = _monotonic()
+        idle_timeout = self.idle_timeout
         
+        # 在同一次加锁内找出并移除过期的空闲连接，使用中的连接不受影响
         with self._lock:
-            for conn_id, conn_info in self._connections.items():
-                if (current_time - conn_info.last_used) > self.idle_timeout:
-                    expired_connections.append(conn_id)
+            connections = self._connections
+            expired = [
+                conn_id for conn_id, conn_info in connections.items()
+                if not conn_info.is_active and now - conn_info.last_used > idle_timeout
+            ]
+            for conn_id in expired:
+                del connections[conn_id]
+            # 同时移出空闲栈；与无锁的获取并发时可能已被取走，取走方会跳过该ID
+            idle_remove = self._idle.remove
+            for conn_id in expired:
+                try:
+                    idle_remove(conn_id)
+                except ValueError:
+                    pass
         
-        # 清理过期连接
-        for conn_id in expired_connections:
-            self._remove_connection(conn_id)
-            logger.info(f"清理过期连接: {conn_id}")
+        # 日志在锁外输出，合并为一条摘要
+        if expired:
+            logger.info("清理过期连接 %d 个: %r", len(expired), expired[:10])
     
-    def _remove_connection(self, conn_id: str):
+    def _remove_connection(self, conn_id: int):
         """移除连接"""
         with self._lock:
             if conn_id in self._connections:
@@ -310,7 +700,21 @@ class ConnectionPool:
         """
         return ConnectionContext(self, connection_factory)
     
-    def _acquire_connection(self, connection_factory: Optional[Callable] = None) -> str:
+    def aget_connection(self, connection_factory: Optional[Callable] = None) -> 'ConnectionContext':
+        """
+        获取连接的异步上下文管理器（async with pool.aget_connection() as conn_id）
+        
+        获取与释放连接本身不阻塞，与get_connection返回同一种上下文对象。
+        
+        Args:
+            connection_factory: 连接工厂函数
+            
+        Returns:
+            连接上下文管理器
+        """
+        return ConnectionContext(self, connection_factory)
+    
+    def _acquire_connection(self, connection_factory: Optional[Callable] = None) -> int:
         """
         获取连接ID
         
@@ -320,20 +724,31 @@ class ConnectionPool:
         Returns:
             连接ID
         """
+        # 快速路径：无锁复用空闲连接
+        idle_pop = self._idle.pop
+        connections = self._connections
+        while True:
+            try:
+                conn_id = idle_pop()
+            except IndexError:
+                break
+            conn_info = connections.get(conn_id)
+            if conn_info is None:
+                continue
+            conn_info.is_active = True
+            conn_info.last_used = _monotonic()
+            # 标记为使用中之前可能已被清理线程移除
+            if conn_id in connections:
+                return conn_id
+
+        # 慢速路径：加锁创建新连接
         with self._lock:
-            # 检查是否有可用连接
-            for conn_id, conn_info in self._connections.items():
-                if conn_info.is_active:
-                    conn_info.last_used = time.time()
-                    return conn_id
-            
-            # 创建新连接
             if len(self._connections) < self.max_connections:
-                conn_id = f"conn_{int(time.time() * 1000)}_{id(self)}"
+                conn_id = _next_conn_id()
                 conn_info = ConnectionInfo(
                     id=conn_id,
-                    created_at=time.time(),
-                    last_used=time.time()
+                    created_at=_monotonic(),
+                    last_used=_monotonic()
                 )
                 self._connections[conn_id] = conn_info
                 return conn_id
@@ -341,16 +756,18 @@ class ConnectionPool:
             # 连接池已满，等待或抛出异常
             raise RuntimeError(f"连接池已满，最大连接数: {self.max_connections}")
     
-    def _release_connection(self, conn_id: str):
+    def _release_connection(self, conn_id: int):
         """
         释放连接
         
         Args:
             conn_id: 连接ID
         """
-        with self._lock:
-            if conn_id in self._connections:
-                self._connections[conn_id].last_used = time.time()
+        conn_info = self._connections.get(conn_id)
+        if conn_info is not None:
+            conn_info.last_used = _monotonic()
+            conn_info.is_active = False
+            self._idle.append(conn_id)
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -370,12 +787,12 @@ class ConnectionPool:
     
     def close(self):
         """关闭连接池"""
+        # 调度器在下次到期时发现已关闭并丢弃该连接池的任务
         self._stop_cleanup.set()
-        if self._cleanup_thread and self._cleanup_thread.is_alive():
-            self._cleanup_thread.join(timeout=5.0)
         
         with self._lock:
             self._connections.clear()
+            self._idle.clear()
 
 
 class ConnectionContext:
@@ -384,17 +801,25 @@ class ConnectionContext:
     def __init__(self, pool: ConnectionPool, connection_factory: Optional[Callable] = None):
         self.pool = pool
         self.connection_factory = connection_factory
-        self.conn_id: Optional[str] = None
+        self.conn_id: Optional[int] = None
     
-    def __enter__(self) -> str:
+    def __enter__(self) -> int:
         """进入上下文"""
         self.conn_id = self.pool._acquire_connection(self.connection_factory)
         return self.conn_id
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """退出上下文"""
-        if self.conn_id:
+        if self.conn_id is not None:
             self.pool._release_connection(self.conn_id)
+    
+    async def __aenter__(self) -> int:
+        """进入异步上下文"""
+        return self.__enter__()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """退出异步上下文"""
+        self.__exit__(exc_type, exc_val, exc_tb)
 
 
 class HealthStatus(Enum):
@@ -416,6 +841,43 @@ class HealthCheck:
     recovery_threshold: int = 2
 
 
+def _timed_check(func: Callable[[], bool]) -> Tuple[bool, float]:
+    """在线程池中执行健康检查，返回(结果, 耗时)"""
+    start = _monotonic()
+    result = bool(_timeout_worker(func, (), {}))
+    return result, _monotonic() - start
+
+
+class _CheckRecord:
+    """单项健康检查的结果记录，计数与平均耗时随每次检查增量更新"""
+
+    __slots__ = ("ring", "ok", "fail", "ewma_latency")
+
+    # 保留的最近结果条数
+    RING_SIZE = 256
+    # 耗时指数加权移动平均的平滑系数
+    EWMA_ALPHA = 0.1
+
+    def __init__(self):
+        self.ring: deque = deque(maxlen=self.RING_SIZE)
+        self.ok = 0
+        self.fail = 0
+        self.ewma_latency = 0.0
+
+    def record(self, ok: bool, latency: float):
+        """记录一次检查结果"""
+        if self.ok or self.fail:
+            self.ewma_latency += self.EWMA_ALPHA * (latency - self.ewma_latency)
+        else:
+            # 首次结果直接作为初值，避免平均值从0缓慢爬升
+            self.ewma_latency = latency
+        if ok:
+            self.ok += 1
+        else:
+            self.fail += 1
+        self.ring.append((time.time(), ok, latency))
+
+
 class HealthChecker:
     """
     健康检查器
@@ -429,11 +891,15 @@ class HealthChecker:
     
     def __init__(self):
         self._checks: Dict[str, HealthCheck] = {}
-        self._status_history: List[Tuple[float, str, HealthStatus]] = []
+        # 状态历史环形缓冲区，超出长度时自动丢弃最旧的记录
+        self._status_history: deque = deque(maxlen=1000)
         self._current_status = HealthStatus.UNKNOWN
         self._failure_counts: Dict[str, int] = {}
         self._recovery_counts: Dict[str, int] = {}
-        self._lock = threading.RLock()
+        self._records: Dict[str, _CheckRecord] = {}
+        self._lock = threading.Lock()
+        # 并行执行检查的线程池，同时用于实现检查超时
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="HealthChecker")
     
     def add_check(self, check: HealthCheck):
         """
@@ -446,6 +912,7 @@ class HealthChecker:
             self._checks[check.name] = check
             self._failure_counts[check.name] = 0
             self._recovery_counts[check.name] = 0
+            self._records[check.name] = _CheckRecord()
     
     def remove_check(self, name: str):
         """
@@ -459,44 +926,50 @@ class HealthChecker:
                 del self._checks[name]
                 del self._failure_counts[name]
                 del self._recovery_counts[name]
+                del self._records[name]
     
-    def check_health(self) -> HealthStatus:
+    def check_health(self, deadline: Optional[float] = None) -> HealthStatus:
         """
         执行健康检查
         
+        各项检查在线程池中并行执行，总耗时取决于最慢的检查而不是所有检查之和；
+        执行检查期间不持锁。
+        
+        Args:
+            deadline: 本轮检查的总时限（秒），到期仍未返回的检查视为失败；
+                      None表示只受各项检查自身的超时限制
+        
         Returns:
             当前健康状态
         """
         with self._lock:
-            if not self._checks:
+            checks = list(self._checks.values())
+            if not checks:
                 self._current_status = HealthStatus.UNKNOWN
                 return self._current_status
-            
+        
+        results = self._run_checks(checks, deadline)
+        
+        with self._lock:
             healthy_checks = 0
-            total_checks = len(self._checks)
-            
-            for name, check in self._checks.items():
-                try:
-                    # 执行健康检查
-                    result = self._execute_check(check)
-                    
-                    if result:
-                        # 检查成功
-                        self._failure_counts[name] = 0
-                        self._recovery_counts[name] += 1
-                        healthy_checks += 1
-                    else:
-                        # 检查失败
-                        self._failure_counts[name] += 1
-                        self._recovery_counts[name] = 0
-                        
-                except Exception as e:
-                    logger.error(f"健康检查失败: {name} - {e}")
+            for check, (result, latency) in zip(checks, results):
+                name = check.name
+                if name not in self._failure_counts:
+                    # 执行期间已被移除
+                    continue
+                self._records[name].record(result, latency)
+                if result:
+                    # 检查成功
+                    self._failure_counts[name] = 0
+                    self._recovery_counts[name] += 1
+                    healthy_checks += 1
+                else:
+                    # 检查失败
                     self._failure_counts[name] += 1
                     self._recovery_counts[name] = 0
             
             # 确定整体健康状态
-            health_ratio = healthy_checks / total_checks
+            health_ratio = healthy_checks / len(checks)
             
             if health_ratio >= 0.9:
                 self._current_status = HealthStatus.HEALTHY
@@ -508,44 +981,44 @@ class HealthChecker:
             # 记录状态历史
             self._status_history.append((time.time(), "overall", self._current_status))
             
-            # 限制历史记录长度
-            if len(self._status_history) > 1000:
-                self._status_history = self._status_history[-500:]
-            
             return self._current_status
     
-    def _execute_check(self, check: HealthCheck) -> bool:
+    def _run_checks(self, checks: List[HealthCheck],
+                    deadline: Optional[float] = None) -> List[Tuple[bool, float]]:
         """
-        执行单个健康检查
+        并行执行健康检查
         
         Args:
-            check: 健康检查配置
+            checks: 健康检查配置列表
+            deadline: 总时限（秒），None表示不限制
             
         Returns:
-            检查结果
-        """
-        try:
-            # 使用超时执行检查
-            import signal
-            
-            def timeout_handler(signum, frame):
-                raise TimeoutError(f"健康检查超时: {check.name}")
-            
-            # 设置超时信号
-            old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-            signal.alarm(int(check.timeout))
-            
+            与checks一一对应的(检查结果, 耗时)，超时或异常视为失败
+        """
+        start = _monotonic()
+        end = start + deadline if deadline is not None else None
+        futures = [
+            self._executor.submit(_timed_check, check.check_func)
+            for check in checks
+        ]
+        
+        results = []
+        for check, future in zip(checks, futures):
+            # 每项检查的超时都从提交时开始计算，且不超过总时限
+            check_end = start + check.timeout
+            if end is not None and end < check_end:
+                check_end = end
+            remaining = check_end - _monotonic()
             try:
-                result = check.check_func()
-                return bool(result)
-            finally:
-                # 恢复原信号处理器
-                signal.alarm(0)
-                signal.signal(signal.SIGALRM, old_handler)
-                
-        except Exception as e:
-            logger.error(f"健康检查执行异常: {check.name} - {e}")
-            return False
+                results.append(future.result(timeout=max(remaining, 0)))
+            except FuturesTimeoutError:
+                future.cancel()
+                logger.error("健康检查超时: %s", check.name)
+                results.append((False, _monotonic() - start))
+            except Exception as e:
+                logger.error("健康检查执行异常: %s - %s", check.name, e)
+                results.append((False, _monotonic() - start))
+        return results
     
     def get_status(self) -> HealthStatus:
         """
@@ -568,23 +1041,42 @@ class HealthChecker:
             健康状态历史记录
         """
         with self._lock:
-            return self._status_history[-limit:] if limit > 0 else self._status_history.copy()
+            history = self._status_history
+            if 0 < limit < len(history):
+                return list(itertools.islice(history, len(history) - limit, None))
+            return list(history)
     
-    def get_check_stats(self) -> Dict[str, Dict[str, int]]:
+    def get_check_stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
         """
         获取检查统计信息
         
+        计数和平均耗时在每次检查时增量维护，获取统计无需遍历历史记录。
+        
         Returns:
-            检查统计信息
+            检查统计信息，包括连续失败/恢复次数、累计成功/失败/总次数
+            以及耗时的指数加权移动平均（秒）
         """
         with self._lock:
-            return {
-                name: {
+            stats = {}
+            for name in self._checks.keys():
+                record = self._records[name]
+                stats[name] = {
                     'failures': self._failure_counts.get(name, 0),
-                    'recoveries': self._recovery_counts.get(name, 0)
+                    'recoveries': self._recovery_counts.get(name, 0),
+                    'ok': record.ok,
+                    'fail': record.fail,
+                    'total': record.ok + record.fail,
+                    'ewma_latency': record.ewma_latency
                 }
-                for name in self._checks.keys()
-            }
+            return stats
+    
+    def close(self):
+        """
+        关闭检查线程池
+        
+        关闭后不能再执行健康检查；已超时仍在后台运行的检查不会被等待。
+        """
+        self._executor.shutdown(wait=False)
 
 
 class CircuitState(Enum):
@@ -609,7 +1101,8 @@ class CircuitBreaker:
         self,
         failure_threshold: int = 5,
         recovery_timeout: float = 60.0,
-        expected_exception: Type[Exception] = Exception
+        expected_exception: Union[Type[Exception], Tuple[Type[Exception], ...]] = Exception,
+        success_threshold: int = 2
     ):
         """
         初始化熔断器
@@ -617,17 +1110,30 @@ class CircuitBreaker:
         Args:
             failure_threshold: 失败阈值
             recovery_timeout: 恢复超时时间（秒）
-            expected_exception: 预期的异常类型
+            expected_exception: 预期的异常类型（单个类或类的元组）
+            success_threshold: 半开状态下连续探测成功多少次后关闭熔断器
         """
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.expected_exception = expected_exception
+        self.success_threshold = success_threshold
         
         self._state = CircuitState.CLOSED
         self._failure_count = 0
         self._last_failure_time = 0
         self._success_count = 0
-        self._lock = threading.RLock()
+        self._probe_inflight = False  # 半开状态下是否已有探测调用在执行
+        self._lock = threading.Lock()
+    
+    @property
+    def expected_exception(self) -> Union[Type[Exception], Tuple[Type[Exception], ...]]:
+        """预期的异常类型"""
+        return self._expected_exception
+    
+    @expected_exception.setter
+    def expected_exception(self, value: Union[Type[Exception], Tuple[Type[Exception], ...]]):
+        self._expected_exception = value
+        self._except_target = _except_target(value)
     
     def call(self, func: Callable, *args, **kwargs) -> Any:
         """
@@ -644,52 +1150,126 @@ class CircuitBreaker:
         Raises:
             熔断器异常或函数异常
         """
+        # 状态是单个引用，无锁读取即可；只有非关闭状态才需要加锁判断是否放行
+        probe = self._state is not CircuitState.CLOSED and self._admit()
+        
+        # 执行函数时不持锁，各调用可以并发执行
+        try:
+            result = func(*args, **kwargs)
+        except self._except_target:
+            # 执行失败
+            self._on_failure(probe)
+            raise
+        except BaseException:
+            # 非预期异常不计入失败，但需要释放探测名额
+            if probe:
+                self._release_probe()
+            raise
+        
+        # 执行成功
+        self._on_success(probe)
+        return result
+    
+    async def acall(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        通过熔断器调用协程函数
+        
+        Args:
+            func: 要调用的协程函数
+            *args: 函数位置参数
+            **kwargs: 函数关键字参数
+            
+        Returns:
+            函数执行结果
+            
+        Raises:
+            熔断器异常或函数异常
+        """
+        probe = self._state is not CircuitState.CLOSED and self._admit()
+        
+        try:
+            result = await func(*args, **kwargs)
+        except self._except_target:
+            self._on_failure(probe)
+            raise
+        except BaseException:
+            if probe:
+                self._release_probe()
+            raise
+        
+        self._on_success(probe)
+        return result
+    
+    def _admit(self) -> bool:
+        """
+        熔断器非关闭状态时决定是否放行本次调用
+        
+        打开状态到达恢复时间后进入半开状态；半开状态同一时间只放行一个探测调用，
+        其余调用直接拒绝，避免尚未恢复的服务被突发流量再次压垮。
+        
+        Returns:
+            本次调用是否为半开状态的探测调用
+            
+        Raises:
+            RuntimeError: 熔断器拒绝本次调用
+        """
+        if self._state is CircuitState.OPEN and _monotonic() - self._last_failure_time <= self.recovery_timeout:
+            # 熔断器仍然打开，无需加锁即可拒绝
+            raise RuntimeError("熔断器处于打开状态，拒绝调用")
         with self._lock:
-            if self._state == CircuitState.OPEN:
-                if time.time() - self._last_failure_time > self.recovery_timeout:
-                    # 进入半开状态
-                    self._state = CircuitState.HALF_OPEN
-                    self._success_count = 0
-                    logger.info("熔断器进入半开状态，开始测试恢复")
-                else:
-                    # 熔断器仍然打开
+            # 加锁后再次确认，只有一个线程执行状态转换
+            state = self._state
+            if state is CircuitState.CLOSED:
+                return False
+            if state is CircuitState.OPEN:
+                if _monotonic() - self._last_failure_time <= self.recovery_timeout:
                     raise RuntimeError("熔断器处于打开状态，拒绝调用")
-            
-            try:
-                # 执行函数
-                result = func(*args, **kwargs)
-                
-                # 执行成功
-                self._on_success()
-                return result
-                
-            except self.expected_exception as e:
-                # 执行失败
-                self._on_failure()
-                raise e
+                # 进入半开状态
+                self._state = CircuitState.HALF_OPEN
+                self._success_count = 0
+                logger.info("熔断器进入半开状态，开始测试恢复")
+            if self._probe_inflight:
+                raise RuntimeError("熔断器处于半开状态，正在测试恢复，拒绝调用")
+            self._probe_inflight = True
+            return True
+    
+    def _release_probe(self):
+        """释放半开状态的探测名额"""
+        with self._lock:
+            self._probe_inflight = False
     
-    def _on_success(self):
+    def _on_success(self, probe: bool = False):
         """处理成功情况"""
+        # 正常状态且没有累计失败时无需更新，不加锁
+        if not probe and self._state is CircuitState.CLOSED and not self._failure_count:
+            return
         with self._lock:
-            if self._state == CircuitState.HALF_OPEN:
-                self._success_count += 1
-                if self._success_count >= 2:  # 连续成功2次才关闭熔断器
-                    self._state = CircuitState.CLOSED
-                    self._failure_count = 0
-                    logger.info("熔断器关闭，服务恢复正常")
+            if probe:
+                self._probe_inflight = False
+            if self._state is CircuitState.HALF_OPEN:
+                # 只统计探测调用，半开前已放行的调用不代表服务已恢复
+                if probe:
+                    self._success_count += 1
+                    if self._success_count >= self.success_threshold:
+                        self._state = CircuitState.CLOSED
+                        self._failure_count = 0
+                        logger.info("熔断器关闭，服务恢复正常")
             else:
                 # 正常状态，重置失败计数
                 self._failure_count = 0
     
-    def _on_failure(self):
+    def _on_failure(self, probe: bool = False):
         """处理失败情况"""
         with self._lock:
+            if probe:
+                self._probe_inflight = False
             self._failure_count += 1
-            self._last_failure_time = time.time()
+            self._last_failure_time = _monotonic()
             
-            if self._failure_count >= self.failure_threshold:
+            # 半开状态下任何失败都立即重新打开熔断器
+            if self._state is CircuitState.HALF_OPEN or self._failure_count >= self.failure_threshold:
                 self._state = CircuitState.OPEN
-                logger.warning(f"熔断器打开，失败次数: {self._failure_count}")
+                logger.warning("熔断器打开，失败次数: %d", self._failure_count)
     
     def get_state(self) -> CircuitState:
         """
@@ -698,8 +1278,7 @@ class CircuitBreaker:
         Returns:
             熔断器状态
         """
-        with self._lock:
-            return self._state
+        return self._state
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -713,7 +1292,10 @@ class CircuitBreaker:
                 'state': self._state.value,
                 'failure_count': self._failure_count,
                 'success_count': self._success_count,
-                'last_failure_time': self._last_failure_time
+                # 对外给出墙上时间
+                'last_failure_time': (
+                    time.time() - (_monotonic() - self._last_failure_time) if self._last_failure_time else 0
+                )
             }
     
     def reset(self):
@@ -723,6 +1305,66 @@ class CircuitBreaker:
             self._failure_count = 0
             self._success_count = 0
             self._last_failure_time = 0
+            self._probe_inflight = False
+
+
+class _TimingWindow:
+    """
+    最近N次执行时间的滑动窗口
+
+    增量维护窗口内的总和，并用单调队列维护窗口最小/最大值，
+    统计时无需遍历样本（追加为均摊O(1)）。
+    """
+
+    __slots__ = ("size", "samples", "total", "seq", "_mins", "_maxs")
+
+    def __init__(self, size: int = 100):
+        self.size = size
+        self.samples: deque = deque()
+        self.total = 0.0
+        self.seq = 0
+        self._mins: deque = deque()  # (序号, 值)，值单调递增
+        self._maxs: deque = deque()  # (序号, 值)，值单调递减
+
+    def add(self, value: float):
+        samples = self.samples
+        if len(samples) == self.size:
+            self.total -= samples.popleft()
+        samples.append(value)
+        self.total += value
+        self.seq += 1
+        seq = self.seq
+
+        mins, maxs = self._mins, self._maxs
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        mins.append((seq, value))
+        while maxs and maxs[-1][1] <= value:
+            maxs.pop()
+        maxs.append((seq, value))
+
+        # 移除已滑出窗口的极值
+        oldest = seq - self.size
+        if mins[0][0] <= oldest:
+            mins.popleft()
+        if maxs[0][0] <= oldest:
+            maxs.popleft()
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self.samples)
+
+    @property
+    def minimum(self) -> float:
+        return self._mins[0][1]
+
+    @property
+    def maximum(self) -> float:
+        return self._maxs[0][1]
 
 
 class TimeoutManager:
@@ -744,8 +1386,13 @@ class TimeoutManager:
             default_timeout: 默认超时时间（秒）
         """
         self.default_timeout = default_timeout
-        self._timeout_stats: Dict[str, List[float]] = {}
-        self._lock = threading.RLock()
+        # 每个函数最近100次的执行时间
+        self._timeout_stats: Dict[str, _TimingWindow] = {}
+        # 每个函数的超时次数
+        self._timeout_counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        # 执行被装饰函数的线程池，用于实现超时
+        self._executor = ThreadPoolExecutor(thread_name_prefix="TimeoutManager")
     
     def with_timeout(self, timeout: Optional[float] = None):
         """
@@ -763,32 +1410,18 @@ class TimeoutManager:
                 actual_timeout = timeout or self.default_timeout
                 func_name = getattr(func, '__name__', str(func))
                 
-                start_time = time.time()
+                start_time = _monotonic()
                 try:
-                    # 使用信号实现超时
-                    import signal
-                    
-                    def timeout_handler(signum, frame):
-                        raise TimeoutError(f"操作超时: {func_name} ({actual_timeout}s)")
-                    
-                    # 设置超时信号
-                    old_handler = signal.signal(signal.SIGALRM, timeout_handler)
-                    signal.alarm(int(actual_timeout))
-                    
-                    try:
-                        result = func(*args, **kwargs)
-                        return result
-                    finally:
-                        # 恢复原信号处理器
-                        signal.alarm(0)
-                        signal.signal(signal.SIGALRM, old_handler)
-                        
+                    # 在线程池中执行函数并等待结果
+                    return _call_with_timeout(self._executor, actual_timeout, func_name, func, *args, **kwargs)
                 except TimeoutError:
-                    logger.error(f"操作超时: {func_name} ({actual_timeout}s)")
+                    logger.error("操作超时: %s (%ss)", func_name, actual_timeout)
+                    with self._lock:
+                        self._timeout_counts[func_name] += 1
                     raise
                 finally:
                     # 记录执行时间
-                    execution_time = time.time() - start_time
+                    execution_time = _monotonic() - start_time
                     self._record_execution_time(func_name, execution_time)
                 
             return wrapper
@@ -803,14 +1436,10 @@ class TimeoutManager:
             execution_time: 执行时间
         """
         with self._lock:
-            if func_name not in self._timeout_stats:
-                self._timeout_stats[func_name] = []
-            
-            self._timeout_stats[func_name].append(execution_time)
-            
-            # 限制统计记录数量
-            if len(self._timeout_stats[func_name]) > 100:
-                self._timeout_stats[func_name] = self._timeout_stats[func_name][-50:]
+            window = self._timeout_stats.get(func_name)
+            if window is None:
+                window = self._timeout_stats[func_name] = _TimingWindow(100)
+            window.add(execution_time)
     
     def get_suggested_timeout(self, func_name: str) -> float:
         """
@@ -823,19 +1452,19 @@ class TimeoutManager:
             建议的超时时间
         """
         with self._lock:
-            if func_name not in self._timeout_stats:
-                return self.default_timeout
-            
-            times = self._timeout_stats[func_name]
-            if not times:
-                return self.default_timeout
-            
-            # 计算平均执行时间
-            avg_time = sum(times) / len(times)
-            
-            # 建议超时时间为平均时间的3倍，但不超过默认超时的2倍
-            suggested = min(avg_time * 3, self.default_timeout * 2)
-            return max(suggested, 1.0)  # 至少1秒
+            return self._suggest_timeout(self._timeout_stats.get(func_name))
+    
+    def _suggest_timeout(self, window: Optional[_TimingWindow]) -> float:
+        """根据执行时间记录计算建议超时时间（调用方需持有锁）"""
+        if window is None or not window.count:
+            return self.default_timeout
+        
+        # 平均执行时间
+        avg_time = window.mean
+        
+        # 建议超时时间为平均时间的3倍，但不超过默认超时的2倍
+        suggested = min(avg_time * 3, self.default_timeout * 2)
+        return max(suggested, 1.0)  # 至少1秒
     
     def get_stats(self) -> Dict[str, Dict[str, float]]:
         """
@@ -846,16 +1475,48 @@ class TimeoutManager:
         """
         with self._lock:
             stats = {}
-            for func_name, times in self._timeout_stats.items():
-                if times:
+            for func_name, window in self._timeout_stats.items():
+                if window.count:
                     stats[func_name] = {
-                        'avg_time': sum(times) / len(times),
-                        'max_time': max(times),
-                        'min_time': min(times),
-                        'count': len(times),
-                        'suggested_timeout': self.get_suggested_timeout(func_name)
+                        'avg_time': window.mean,
+                        'max_time': window.maximum,
+                        'min_time': window.minimum,
+                        'count': window.count,
+                        'timeouts': self._timeout_counts.get(func_name, 0),
+                        'suggested_timeout': self._suggest_timeout(window)
                     }
             return stats
+    
+    def close(self):
+        """
+        关闭执行线程池
+        
+        关闭后不能再执行带超时的调用；已超时仍在后台运行的函数不会被等待。
+        """
+        self._executor.shutdown(wait=False)
+
+
+# 与pyidevice.utils.validate_udid共用同一UDID格式
+_UDID_MATCH = _UDID_RE.fullmatch
+# 反向域名格式的Bundle ID
+_BUNDLE_ID_MATCH = re.compile(
+    r'[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?)*'
+).fullmatch
+
+
+# 批量验证时对拼接后的文本整体扫描，每行一个UDID
+_UDID_SCAN = re.compile(r'^(?:%s)$' % _UDID_PATTERN, re.MULTILINE).findall
+
+
+# 同一批UDID/Bundle ID会被反复验证（轮询、批量操作），缓存最近的验证结果
+@lru_cache(maxsize=1024)
+def _is_valid_udid(udid: str) -> bool:
+    return _UDID_MATCH(udid) is not None
+
+
+@lru_cache(maxsize=1024)
+def _is_valid_bundle_id(bundle_id: str) -> bool:
+    return _BUNDLE_ID_MATCH(bundle_id) is not None
 
 
 class InputValidator:
@@ -872,7 +1533,7 @@ class InputValidator:
     @staticmethod
     def validate_udid(udid: str) -> bool:
         """
-        验证UDID格式
+        验证UDID格式（40位十六进制，或"8位-16位"十六进制的新格式）
         
         Args:
             udid: 设备UDID
@@ -880,18 +1541,26 @@ class InputValidator:
         Returns:
             是否有效
         """
-        if not isinstance(udid, str):
-            return False
+        return isinstance(udid, str) and _is_valid_udid(udid)
+    
+    @staticmethod
+    def validate_udids(udids: Iterable[str]) -> List[bool]:
+        """
+        批量验证UDID格式
         
-        # UDID应该是40位十六进制字符串
-        if len(udid) != 40:
-            return False
+        把所有UDID按行拼接后用一次正则扫描找出有效项，避免逐个调用验证函数。
         
-        try:
-            int(udid, 16)
-            return True
-        except ValueError:
-            return False
+        Args:
+            udids: 设备UDID序列
+            
+        Returns:
+            与输入一一对应的验证结果
+        """
+        udids = list(udids)
+        texts = [udid for udid in udids if isinstance(udid, str)]
+        # 匹配结果不含换行符，含换行的输入不会被误判为有效
+        valid = set(_UDID_SCAN("\n".join(texts)))
+        return [isinstance(udid, str) and udid in valid for udid in udids]
     
     @staticmethod
     def validate_port(port: Union[int, str]) -> bool:
@@ -910,6 +1579,24 @@ class InputValidator:
         except (ValueError, TypeError):
             return False
     
+    @staticmethod
+    def validate_ports(ports: Iterable[Union[int, str]]) -> List[bool]:
+        """
+        批量验证端口号
+        
+        Args:
+            ports: 端口号序列
+            
+        Returns:
+            与输入一一对应的验证结果
+        """
+        validate_port = InputValidator.validate_port
+        # 整数直接比较范围，其他类型走完整的转换逻辑
+        return [
+            1 <= port <= 65535 if type(port) is int else validate_port(port)
+            for port in ports
+        ]
+    
     @staticmethod
     def validate_timeout(timeout: Union[int, float]) -> bool:
         """
@@ -938,13 +1625,41 @@ class InputValidator:
         Returns:
             是否有效
         """
-        if not isinstance(bundle_id, str):
-            return False
-        
-        # Bundle ID应该符合反向域名格式
-        import re
-        pattern = r'^[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?(\.[a-zA-Z0-9]([a-zA-Z0-9\-]*[a-zA-Z0-9])?)*$'
-        return bool(re.match(pattern, bundle_id))
+        return isinstance(bundle_id, str) and _is_valid_bundle_id(bundle_id)
+
+
+class _ResourceEntry:
+    """已注册资源及其元数据"""
+
+    __slots__ = ("_ref", "_strong", "created_at", "cleanup_func", "_refs", "finalizer")
+
+    def __init__(self, resource: Any, cleanup_func: Optional[Callable]):
+        # 支持弱引用的资源只持有弱引用，调用方释放后可被回收；
+        # 不支持弱引用的对象（list、dict等内置类型）仍然强引用
+        try:
+            self._ref = weakref.ref(resource)
+            self._strong = None
+        except TypeError:
+            self._ref = None
+            self._strong = resource
+        self.created_at = _monotonic()
+        self.cleanup_func = cleanup_func
+        # 每次获取追加一个标记、每次释放弹出一个标记：deque的append/pop是原子操作，
+        # 增减引用计数无需加锁，且释放次数多于获取次数时自然不会减到负数
+        self._refs: deque = deque()
+        self.finalizer: Optional[weakref.finalize] = None
+
+    @property
+    def ref_count(self) -> int:
+        """当前引用计数"""
+        return len(self._refs)
+
+    @property
+    def resource(self) -> Optional[Any]:
+        """资源对象，已被回收时为None"""
+        if self._ref is None:
+            return self._strong
+        return self._ref()
 
 
 class ResourceManager:
@@ -956,12 +1671,14 @@ class ResourceManager:
     - 自动清理机制
     - 资源使用统计
     - 内存泄漏检测
+    
+    支持弱引用的资源只被弱引用，不会因为注册而无法回收；资源被回收后
+    自动注销（此时对象已不存在，不再调用清理函数）。
     """
     
     def __init__(self):
-        self._resources: Dict[str, Any] = {}
-        self._resource_metadata: Dict[str, Dict[str, Any]] = {}
-        self._lock = threading.RLock()
+        self._entries: Dict[str, _ResourceEntry] = {}
+        self._lock = threading.Lock()
     
     def register_resource(self, name: str, resource: Any, cleanup_func: Optional[Callable] = None):
         """
@@ -972,13 +1689,21 @@ class ResourceManager:
             resource: 资源对象
             cleanup_func: 清理函数
         """
+        entry = _ResourceEntry(resource, cleanup_func)
+        if entry._ref is not None:
+            entry.finalizer = weakref.finalize(resource, self._on_collected, name, entry)
         with self._lock:
-            self._resources[name] = resource
-            self._resource_metadata[name] = {
-                'created_at': time.time(),
-                'cleanup_func': cleanup_func,
-                'ref_count': 0
-            }
+            previous = self._entries.get(name)
+            self._entries[name] = entry
+        if previous is not None and previous.finalizer is not None:
+            previous.finalizer.detach()
+    
+    def _on_collected(self, name: str, entry: _ResourceEntry):
+        """已注册资源被垃圾回收后移除其记录"""
+        with self._lock:
+            if self._entries.get(name) is entry:
+                del self._entries[name]
+        logger.debug("资源已被回收，自动注销: %s", name)
     
     def unregister_resource(self, name: str):
         """
@@ -988,19 +1713,20 @@ class ResourceManager:
             name: 资源名称
         """
         with self._lock:
-            if name in self._resources:
-                # 执行清理
-                metadata = self._resource_metadata.get(name, {})
-                cleanup_func = metadata.get('cleanup_func')
-                if cleanup_func:
-                    try:
-                        cleanup_func(self._resources[name])
-                    except Exception as e:
-                        logger.error(f"资源清理失败: {name} - {e}")
-                
-                # 移除资源
-                del self._resources[name]
-                del self._resource_metadata[name]
+            # 移除资源
+            entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        if entry.finalizer is not None:
+            entry.finalizer.detach()
+        
+        # 清理函数在锁外执行，可以安全地回调资源管理器
+        resource = entry.resource
+        if entry.cleanup_func and resource is not None:
+            try:
+                entry.cleanup_func(resource)
+            except Exception as e:
+                logger.error("资源清理失败: %s - %s", name, e)
     
     def get_resource(self, name: str) -> Optional[Any]:
         """
@@ -1012,11 +1738,19 @@ class ResourceManager:
         Returns:
             资源对象
         """
-        with self._lock:
-            if name in self._resources:
-                self._resource_metadata[name]['ref_count'] += 1
-                return self._resources[name]
+        # 读取路径不加锁：字典查找和引用计数增加都是原子操作
+        entry = self._entries.get(name)
+        if entry is None:
             return None
+        resource = entry.resource
+        if resource is None:
+            # 已被回收，终结回调尚未执行
+            with self._lock:
+                if self._entries.get(name) is entry:
+                    del self._entries[name]
+            return None
+        entry._refs.append(None)
+        return resource
     
     def release_resource(self, name: str):
         """
@@ -1025,10 +1759,13 @@ class ResourceManager:
         Args:
             name: 资源名称
         """
-        with self._lock:
-            if name in self._resource_metadata:
-                self._resource_metadata[name]['ref_count'] = max(0, 
-                    self._resource_metadata[name]['ref_count'] - 1)
+        entry = self._entries.get(name)
+        if entry is not None:
+            try:
+                entry._refs.pop()
+            except IndexError:
+                # 引用计数已为0
+                pass
     
     def cleanup_unused_resources(self, max_age: float = 3600.0):
         """
@@ -1037,19 +1774,19 @@ class ResourceManager:
         Args:
             max_age: 最大存活时间（秒）
         """
-        current_time = time.time()
-        unused_resources = []
+        current_time = _monotonic()
         
         with self._lock:
-            for name, metadata in self._resource_metadata.items():
-                if (metadata['ref_count'] == 0 and 
-                    current_time - metadata['created_at'] > max_age):
-                    unused_resources.append(name)
+            unused_resources = [
+                name for name, entry in self._entries.items()
+                if entry.ref_count == 0 and current_time - entry.created_at > max_age
+            ]
         
         # 清理未使用的资源
         for name in unused_resources:
             self.unregister_resource(name)
-            logger.info(f"清理未使用的资源: {name}")
+        if unused_resources:
+            logger.info("清理未使用的资源 %d 个: %r", len(unused_resources), unused_resources[:10])
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -1058,21 +1795,21 @@ class ResourceManager:
         Returns:
             资源统计信息
         """
+        now = _monotonic()
         with self._lock:
-            total_resources = len(self._resources)
-            total_refs = sum(meta['ref_count'] for meta in self._resource_metadata.values())
-            
-            return {
-                'total_resources': total_resources,
-                'total_references': total_refs,
-                'resources': {
-                    name: {
-                        'ref_count': meta['ref_count'],
-                        'age': time.time() - meta['created_at']
-                    }
-                    for name, meta in self._resource_metadata.items()
+            resources = {
+                name: {
+                    'ref_count': entry.ref_count,
+                    'age': now - entry.created_at
                 }
+                for name, entry in self._entries.items()
             }
+        
+        return {
+            'total_resources': len(resources),
+            'total_references': sum(info['ref_count'] for info in resources.values()),
+            'resources': resources
+        }
 
 
 # 全局稳定性管理器实例
@@ -1124,13 +1861,7 @@ def get_resource_manager() -> ResourceManager:
 def with_retry(config: Optional[RetryConfig] = None):
     """重试装饰器"""
     retry_manager = RetryManager(config) if config else _retry_manager
-    
-    def decorator(func: Callable) -> Callable:
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            return retry_manager.execute(func, *args, **kwargs)
-        return wrapper
-    return decorator
+    return retry_manager.wrap
 
 
 def with_timeout(timeout: Optional[float] = None):
@@ -1141,11 +1872,20 @@ def with_timeout(timeout: Optional[float] = None):
 def with_circuit_breaker(circuit_breaker: Optional[CircuitBreaker] = None):
     """熔断器装饰器"""
     cb = circuit_breaker or _circuit_breaker
+    call = cb.call
     
     def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            acall = cb.acall
+            
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await acall(func, *args, **kwargs)
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            return cb.call(func, *args, **kwargs)
+            return call(func, *args, **kwargs)
         return wrapper
     return decorator
 
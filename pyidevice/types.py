@@ -1,9 +1,23 @@
 """类型定义模块"""
 
 from typing import Dict, List, Optional, Union, Any, Callable
+from dataclasses import fields
 from enum import Enum
 
 
+def add_slots(cls):
+    """
+    为已生成的数据类重建带__slots__的版本
+
+    带默认值的字段会在类上留下同名类属性，不能直接与__slots__共存；
+    默认值已写入生成的__init__中，重建时去掉这些类属性即可。
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = {k: v for k, v in cls.__dict__.items() if k not in names and k not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
 class DeviceStatus(Enum):
     """设备状态枚举"""
 
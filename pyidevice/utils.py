@@ -22,19 +22,102 @@ pyidevice 工具函数模块
     >>> safe_name = safe_filename("My Device")  # "My_Device"
 """
 
+import asyncio
+import os
+import socket
 import subprocess
-import shutil
+import sys
 import platform
 import logging
 import re
 import time
 from typing import List, Dict, Optional, Tuple, Callable, Any
 from pathlib import Path
-from functools import wraps
+from functools import wraps, lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 # 配置日志记录器
 logger = logging.getLogger(__name__)
 
+# 预编译的正则表达式
+_UNSAFE_FN_RE = re.compile(r'[<>:"/\\|?*]')
+# UDID通常是40个字符的十六进制字符串
+# 设备UDID：40位十六进制，或"8位-16位"十六进制的新格式（iPhone XS及之后的设备）
+_UDID_PATTERN = r"[0-9A-Fa-f]{40}|[0-9A-Fa-f]{8}-[0-9A-Fa-f]{16}"
+_UDID_RE = re.compile(_UDID_PATTERN)
+
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+# 当前操作系统名称（小写），进程内不会变化
+_SYSTEM = platform.system().lower()
+
+
+# 运行环境在进程生命周期内不会变化，检查结果缓存在模块级函数上，
+# EnvironmentChecker 的类方法委托给这些函数（lru_cache 不便直接用于类方法）
+@lru_cache(maxsize=1)
+def _system_supported() -> bool:
+    return _SYSTEM in ["darwin", "linux"]
+
+
+@lru_cache(maxsize=1)
+def _python_version_ok() -> bool:
+    return sys.version_info >= (3, 6)
+
+
+@lru_cache(maxsize=1)
+def _libimobiledevice_installed() -> bool:
+    try:
+        # 只关心返回码，输出直接丢弃，省去管道创建和解码
+        result = subprocess.run(
+            ["idevice_id", "--version"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=5,
+        )
+        return result.returncode == 0
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        return False
+
+
+@lru_cache(maxsize=1)
+def _scan_path_executables() -> Dict[str, Tuple[str, ...]]:
+    """
+    遍历一次PATH，建立 文件名 -> 候选完整路径（按PATH顺序）的映射
+
+    代替对每个工具分别调用 shutil.which 逐个目录 stat。
+    """
+    candidates: Dict[str, List[str]] = {}
+    for directory in os.environ.get("PATH", "").split(os.pathsep):
+        if not directory:
+            continue
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            candidates.setdefault(entry.name, []).append(entry.path)
+                    except OSError:
+                        continue
+        except OSError:
+            # 目录不存在或无权限
+            continue
+    return {name: tuple(paths) for name, paths in candidates.items()}
+
+
+@lru_cache(maxsize=8)
+def _tools_available(tools: Tuple[str, ...], tools_dir: Optional[str] = None) -> Dict[str, bool]:
+    results = {}
+    for tool in tools:
+        # 优先检查指定的工具目录，命中时无需扫描PATH
+        if tools_dir and os.access(os.path.join(tools_dir, tool), os.X_OK):
+            results[tool] = True
+            continue
+        # 只对需要的工具检查可执行权限，与 shutil.which 的判定一致
+        results[tool] = any(
+            os.access(path, os.X_OK) for path in _scan_path_executables().get(tool, ())
+        )
+    return results
+
 
 class EnvironmentChecker:
     """
@@ -69,6 +152,9 @@ class EnvironmentChecker:
     # 可选的工具
     OPTIONAL_TOOLS = ["idevicesyslog"]
 
+    # 工具安装目录（如 /opt/homebrew/bin），设置后优先在该目录查找工具
+    TOOLS_DIR = os.environ.get("IDEVICE_TOOLS_DIR")
+
     @classmethod
     def check_system_requirements(cls) -> Dict[str, bool]:
         """
@@ -90,47 +176,45 @@ class EnvironmentChecker:
     @classmethod
     def _check_system_support(cls) -> bool:
         """检查系统是否支持"""
-        system = platform.system().lower()
-        return system in ["darwin", "linux"]
+        return _system_supported()
 
     @classmethod
     def _check_python_version(cls) -> bool:
         """检查Python版本"""
-        import sys
-
-        return sys.version_info >= (3, 6)
+        return _python_version_ok()
 
     @classmethod
     def _check_libimobiledevice(cls) -> bool:
         """检查libimobiledevice是否安装"""
-        try:
-            result = subprocess.run(
-                ["idevice_id", "--version"], capture_output=True, text=True, timeout=5
-            )
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            return False
+        return _libimobiledevice_installed()
 
     @classmethod
     def _check_required_tools(cls) -> Dict[str, bool]:
         """检查必需工具是否可用"""
-        results = {}
-        for tool in cls.REQUIRED_TOOLS:
-            results[tool] = shutil.which(tool) is not None
-        return results
+        # 返回副本，避免调用方修改缓存中的结果
+        return dict(_tools_available(tuple(cls.REQUIRED_TOOLS), cls.TOOLS_DIR))
 
     @classmethod
     def _check_optional_tools(cls) -> Dict[str, bool]:
         """检查可选工具是否可用"""
-        results = {}
-        for tool in cls.OPTIONAL_TOOLS:
-            results[tool] = shutil.which(tool) is not None
-        return results
+        return dict(_tools_available(tuple(cls.OPTIONAL_TOOLS), cls.TOOLS_DIR))
+
+    @classmethod
+    def cache_clear(cls) -> None:
+        """清除缓存的检查结果（安装新工具后或测试中使用）"""
+        for cached in (
+            _system_supported,
+            _python_version_ok,
+            _libimobiledevice_installed,
+            _scan_path_executables,
+            _tools_available,
+        ):
+            cached.cache_clear()
 
     @classmethod
     def get_installation_instructions(cls) -> str:
         """获取安装说明"""
-        system = platform.system().lower()
+        system = _SYSTEM
 
         if system == "darwin":
             return """
@@ -191,19 +275,16 @@ CentOS/RHEL/Fedora:
 
 def format_bytes(bytes_value: int) -> str:
     """格式化字节数为可读格式"""
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if bytes_value < 1024.0:
-            return f"{bytes_value:.1f} {unit}"
-        bytes_value /= 1024.0
-    return f"{bytes_value:.1f} PB"
+    # 由位长度直接得出单位指数（每级 2**10），无需逐级除以 1024
+    n = int(bytes_value) if bytes_value > 0 else 0
+    exp = max(0, min((n.bit_length() - 1) // 10, 5))
+    return f"{bytes_value / (1 << (exp * 10)):.1f} {_BYTE_UNITS[exp]}"
 
 
 def safe_filename(filename: str) -> str:
     """生成安全的文件名"""
-    import re
-
     # 移除或替换不安全的字符
-    safe_name = re.sub(r'[<>:"/\\|?*]', "_", filename)
+    safe_name = _UNSAFE_FN_RE.sub("_", filename)
     # 限制长度
     if len(safe_name) > 200:
         safe_name = safe_name[:200]
@@ -216,21 +297,54 @@ def ensure_directory(path: str) -> bool:
         Path(path).mkdir(parents=True, exist_ok=True)
         return True
     except Exception as e:
-        logger.error(f"Failed to create directory {path}: {e}")
+        logger.error("Failed to create directory %s: %s", path, e)
         return False
 
 
-def retry_on_failure(max_retries: int = 3, delay: float = 1.0, exceptions: tuple = (Exception,)):
+def retry_on_failure(
+    max_retries: int = 3,
+    delay: float = 1.0,
+    exceptions: tuple = (Exception,),
+    backoff_factor: float = 1.0,
+):
     """
     重试装饰器
 
+    协程函数使用 asyncio.sleep 等待，重试期间不阻塞事件循环。
+
     Args:
         max_retries: 最大重试次数
-        delay: 重试间隔（秒）
+        delay: 首次重试间隔（秒）
         exceptions: 需要重试的异常类型
+        backoff_factor: 退避倍数，第n次重试等待 delay * backoff_factor ** n 秒，默认1.0即固定间隔
     """
 
     def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                last_exception = None
+
+                for attempt in range(max_retries + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except exceptions as e:
+                        last_exception = e
+                        if attempt < max_retries:
+                            sleep_for = delay * (backoff_factor ** attempt)
+                            logger.warning(
+                                "Attempt %d failed: %s. Retrying in %ss...", attempt + 1, e, sleep_for
+                            )
+                            await asyncio.sleep(sleep_for)
+                        else:
+                            logger.error("All %d attempts failed", max_retries + 1)
+
+                raise last_exception
+
+            return async_wrapper
+
+        @wraps(func)
         def wrapper(*args, **kwargs):
             last_exception = None
 
@@ -240,14 +354,13 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0, exceptions: tuple
                 except exceptions as e:
                     last_exception = e
                     if attempt < max_retries:
+                        sleep_for = delay * (backoff_factor ** attempt)
                         logger.warning(
-                            f"Attempt {attempt + 1} failed: {e}. Retrying in {delay}s..."
+                            "Attempt %d failed: %s. Retrying in %ss...", attempt + 1, e, sleep_for
                         )
-                        import time
-
-                        time.sleep(delay)
+                        time.sleep(sleep_for)
                     else:
-                        logger.error(f"All {max_retries + 1} attempts failed")
+                        logger.error("All %d attempts failed", max_retries + 1)
 
             raise last_exception
 
@@ -270,26 +383,41 @@ def get_device_udid_from_name(device_name: str) -> Optional[str]:
         from .core import DeviceManager
 
         devices = DeviceManager.get_devices()
-
-        for udid in devices:
-            try:
-                result = subprocess.check_output(
-                    ["idevicename", "-u", udid], universal_newlines=True, timeout=5
-                )
+        if not devices:
+            return None
+
+        # 并发查询各设备名称，按设备顺序检查结果，命中后取消尚未开始的查询
+        executor = ThreadPoolExecutor(max_workers=min(8, len(devices)))
+        futures = [
+            executor.submit(
+                subprocess.check_output,
+                ["idevicename", "-u", udid],
+                universal_newlines=True,
+                timeout=5,
+            )
+            for udid in devices
+        ]
+        try:
+            for udid, future in zip(devices, futures):
+                try:
+                    result = future.result()
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+                    continue
                 if result.strip() == device_name:
                     return udid
-            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
-                continue
-
-        return None
+            return None
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
     except Exception as e:
-        logger.error(f"Failed to get device UDID from name {device_name}: {e}")
+        logger.error("Failed to get device UDID from name %s: %s", device_name, e)
         return None
 
 
 def validate_udid(udid: str) -> bool:
     """
-    验证UDID格式是否正确
+    验证UDID格式是否正确（40位十六进制，或"8位-16位"十六进制的新格式）
 
     Args:
         udid: 设备UDID
@@ -297,11 +425,7 @@ def validate_udid(udid: str) -> bool:
     Returns:
         是否为有效的UDID格式
     """
-    import re
-
-    # UDID通常是40个字符的十六进制字符串
-    pattern = r"^[0-9A-Fa-f]{40}$"
-    return bool(re.match(pattern, udid))
+    return _UDID_RE.fullmatch(udid) is not None
 
 
 def get_available_ports(start_port: int = 8100, count: int = 10) -> List[int]:
@@ -315,17 +439,40 @@ def get_available_ports(start_port: int = 8100, count: int = 10) -> List[int]:
     Returns:
         可用端口列表
     """
-    import socket
-
     available_ports = []
+    bound_sockets = []
 
-    for port in range(start_port, start_port + count):
-        try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+    try:
+        for port in range(start_port, start_port + count):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # 允许绑定处于TIME_WAIT的端口（如刚关闭的iproxy会话），避免误判为占用
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
                 s.bind(("localhost", port))
-                available_ports.append(port)
-        except OSError:
-            # 端口被占用
-            continue
+            except OSError:
+                # 端口被占用
+                s.close()
+                continue
+            # 探测完成前保持绑定，防止后续探测与已选端口冲突
+            bound_sockets.append(s)
+            available_ports.append(port)
+    finally:
+        for s in bound_sockets:
+            s.close()
 
     return available_ports
+
+
+def get_ephemeral_port() -> int:
+    """
+    由系统分配一个空闲端口
+
+    只需要任意可用端口时使用，内核原子地选择未占用的端口，
+    不存在 get_available_ports 先探测后使用之间的竞争窗口。
+
+    Returns:
+        可用端口号
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
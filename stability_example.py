@@ -15,9 +15,11 @@ pyidevice 稳定性功能使用示例
     python3 stability_example.py
 """
 
+import os
 import time
 import random
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pyidevice import (
     Device,
     DeviceManager,
@@ -37,19 +39,34 @@ from pyidevice import (
     HealthCheck,
 )
 
-# 配置日志
+# 配置日志：时间直接输出时间戳，省去每条记录的strftime；
+# 不记录线程/进程信息，创建LogRecord时跳过相应的查询
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    format="%(created).3f %(levelname)s %(name)s %(message)s"
 )
 logger = logging.getLogger(__name__)
 
 
+def _make_rng() -> random.Random:
+    """
+    创建演示用的随机数生成器
+
+    每个演示使用独立的生成器，不与全局random共享状态；
+    设置环境变量DEMO_SEED时结果可复现。
+    """
+    return random.Random(os.environ.get("DEMO_SEED"))
+
+
 def demo_retry_manager():
     """演示重试管理器功能"""
     print("\n=== 重试管理器演示 ===")
+    rng = _make_rng()
     
-    # 创建重试管理器
+    # 创建重试管理器（指数退避 + 全抖动：在[0, 退避延迟]内随机等待）
     retry_config = RetryConfig(
         max_retries=3,
         base_delay=0.5,
@@ -61,7 +78,7 @@ def demo_retry_manager():
     
     # 模拟不稳定的操作
     def unstable_operation():
-        if random.random() < 0.7:  # 70%的失败率
+        if rng.random() < 0.7:  # 70%的失败率
             raise RuntimeError("操作失败")
         return "操作成功"
     
@@ -95,12 +112,14 @@ def demo_connection_pool():
         time.sleep(0.1)
         return f"连接 {conn_id} 操作完成"
     
-    # 并发使用连接
-    results = []
-    for i in range(5):
+    def pooled_work(_):
         with pool.get_connection() as conn_id:
-            result = simulate_connection_work(conn_id)
-            results.append(result)
+            return simulate_connection_work(conn_id)
+    
+    # 并发使用连接：5个任务复用最多3个连接
+    # （连接池满时直接抛出异常而不是等待，因此线程数不超过最大连接数）
+    with ThreadPoolExecutor(max_workers=pool.max_connections) as executor:
+        results = list(executor.map(pooled_work, range(5)))
     
     print(f"连接池操作结果: {results}")
     
@@ -115,6 +134,7 @@ def demo_connection_pool():
 def demo_health_checker():
     """演示健康检查器功能"""
     print("\n=== 健康检查器演示 ===")
+    rng = _make_rng()
     
     # 创建健康检查器
     checker = HealthChecker()
@@ -122,15 +142,15 @@ def demo_health_checker():
     # 添加健康检查
     def device_connectivity_check():
         """模拟设备连接检查"""
-        return random.random() > 0.3  # 70%的健康率
+        return rng.random() > 0.3  # 70%的健康率
     
     def service_availability_check():
         """模拟服务可用性检查"""
-        return random.random() > 0.2  # 80%的健康率
+        return rng.random() > 0.2  # 80%的健康率
     
     def memory_usage_check():
         """模拟内存使用检查"""
-        return random.random() > 0.1  # 90%的健康率
+        return rng.random() > 0.1  # 90%的健康率
     
     # 注册健康检查
     checker.add_check(HealthCheck("设备连接", device_connectivity_check, timeout=2.0))
@@ -147,11 +167,15 @@ def demo_health_checker():
         print(f"检查统计: {stats}")
         
         time.sleep(1)
+    
+    # 关闭健康检查器的线程池
+    checker.close()
 
 
 def demo_circuit_breaker():
     """演示熔断器功能"""
     print("\n=== 熔断器演示 ===")
+    rng = _make_rng()
     
     # 创建熔断器
     breaker = CircuitBreaker(
@@ -162,7 +186,7 @@ def demo_circuit_breaker():
     
     # 模拟不稳定的服务
     def unstable_service():
-        if random.random() < 0.8:  # 80%的失败率
+        if rng.random() < 0.8:  # 80%的失败率
             raise RuntimeError("服务不可用")
         return "服务正常"
     
@@ -217,6 +241,9 @@ def demo_timeout_manager():
     # 显示超时统计
     stats = timeout_manager.get_stats()
     print(f"超时统计: {stats}")
+    
+    # 关闭超时管理器的线程池
+    timeout_manager.close()
 
 
 def demo_input_validator():
@@ -235,15 +262,14 @@ def demo_input_validator():
     ]
     
     print("UDID验证测试:")
-    for udid in test_udids:
-        is_valid = validator.validate_udid(udid)
+    # 批量验证，一次扫描得出全部结果
+    for udid, is_valid in zip(test_udids, validator.validate_udids(test_udids)):
         print(f"  {udid[:20]}... : {'✓' if is_valid else '✗'}")
     
     # 测试端口验证
     test_ports = [8080, 3000, 65535, 0, 99999, "invalid"]
     print("\n端口验证测试:")
-    for port in test_ports:
-        is_valid = validator.validate_port(port)
+    for port, is_valid in zip(test_ports, validator.validate_ports(test_ports)):
         print(f"  {port} : {'✓' if is_valid else '✗'}")
     
     # 测试Bundle ID验证
@@ -305,11 +331,12 @@ def demo_resource_manager():
 def demo_decorators():
     """演示装饰器功能"""
     print("\n=== 装饰器演示 ===")
+    rng = _make_rng()
     
     # 重试装饰器
     @with_retry()
     def retry_function():
-        if random.random() < 0.6:
+        if rng.random() < 0.6:
             raise RuntimeError("随机失败")
         return "重试成功"
     
@@ -322,7 +349,7 @@ def demo_decorators():
     # 熔断器装饰器
     @with_circuit_breaker()
     def circuit_function():
-        if random.random() < 0.7:
+        if rng.random() < 0.7:
             raise RuntimeError("熔断测试失败")
         return "熔断测试成功"
     
@@ -364,15 +391,16 @@ def demo_decorators():
 def demo_integration():
     """演示集成使用"""
     print("\n=== 集成使用演示 ===")
+    rng = _make_rng()
     
     # 模拟设备操作
     def simulate_device_operation(udid):
         """模拟设备操作，包含各种可能的失败"""
         # 模拟网络延迟
-        time.sleep(random.uniform(0.1, 0.3))
+        time.sleep(rng.uniform(0.1, 0.3))
         
         # 模拟各种失败情况
-        failure_type = random.choice(["success", "timeout", "connection", "permission"])
+        failure_type = rng.choice(["success", "timeout", "connection", "permission"])
         
         if failure_type == "success":
             return f"设备 {udid[:10]}... 操作成功"
@@ -385,7 +413,12 @@ def demo_integration():
             raise PermissionError("设备权限不足")
     
     # 使用多个稳定性功能
-    retry_manager = RetryManager(RetryConfig(max_retries=2, base_delay=0.2))
+    retry_manager = RetryManager(RetryConfig(
+        max_retries=2,
+        base_delay=0.2,
+        max_delay=1.0,
+        strategy=RetryStrategy.DECORRELATED_JITTER,
+    ))
     timeout_manager = TimeoutManager(default_timeout=0.5)
     validator = InputValidator()
     
@@ -398,19 +431,26 @@ def demo_integration():
     ]
     
     print("集成稳定性测试:")
-    for udid in test_devices:
-        print(f"\n测试设备: {udid[:15]}...")
-        
-        # 输入验证
-        if not validator.validate_udid(udid):
+    
+    # 输入验证：批量预先过滤无效UDID
+    valid_devices = []
+    for udid, is_valid in zip(test_devices, validator.validate_udids(test_devices)):
+        if is_valid:
+            valid_devices.append(udid)
+        else:
+            print(f"\n测试设备: {udid[:15]}...")
             print("  ✗ UDID格式无效")
-            continue
+    
+    for udid in valid_devices:
+        print(f"\n测试设备: {udid[:15]}...")
         
-        # 使用重试和超时
+        # 使用重试和超时：外层超时限制单次调用卡住的情况，
+        # 重试使用相同的截止时间，不再安排超出时限的重试
         try:
             @timeout_manager.with_timeout(0.8)
             def safe_operation():
-                return retry_manager.execute(simulate_device_operation, udid)
+                deadline = time.monotonic() + 0.8
+                return retry_manager.execute_until(deadline, simulate_device_operation, udid)
             
             result = safe_operation()
             print(f"  ✓ {result}")
@@ -419,6 +459,8 @@ def demo_integration():
             print(f"  ✗ 操作失败: {e}")
         except TimeoutError as e:
             print(f"  ✗ 操作超时: {e}")
+    
+    timeout_manager.close()
 
 
 def main():
@@ -442,7 +484,7 @@ def main():
         print("稳定性功能演示完成！")
         
     except Exception as e:
-        logger.error(f"演示过程中发生错误: {e}")
+        logger.error("演示过程中发生错误: %s", e)
         raise
 
 